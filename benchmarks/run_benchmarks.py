@@ -0,0 +1,584 @@
+"""
+Benchmarks for the display and motion hot paths, run against simulated
+hardware (ST7789Emulator for the panel, SimServo and SimClock for motion).
+
+    python -m benchmarks.run_benchmarks                     # compare with baseline.json
+    python -m benchmarks.run_benchmarks --update-baseline   # record a new baseline
+
+Exits with status 1 when any metric is worse than its baseline by more than
+the threshold for its kind. 'model' metrics (bytes, transfers, servo writes,
+simulated seconds) are deterministic; 'timing' metrics are CPU time on the
+machine running the suite, so record the baseline on the robot's Pi. The
+suite runs several passes and timing metrics keep their best; a timing
+regression is confirmed by running the suite again.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from benchmarks.sim_hardware import SimClock, install_robot_hat, servo_log
+from servo_bus import bus
+
+install_robot_hat()
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+# A shared or throttling machine drifts by up to 2x over a run, so by default
+# timing only fails when it doubles; on a quiet Pi, --timing-threshold 0.25
+THRESHOLDS = {'model': 0.05, 'timing': 1.0}
+TIMING_FLOOR_MS = 0.05  # timing changes smaller than this are noise
+PASSES = 3              # runs of the whole suite; timing metrics keep the best
+
+SPI_FREQ = 10000000     # what the face and eyes scripts run the panel at
+MAX_TRANSFER = 4096     # stock spidev bufsiz, fixed so results match across machines
+
+BENCHMARKS = []
+
+
+def benchmark(fn):
+    BENCHMARKS.append(fn)
+    return fn
+
+
+def per_call_ms(fn, number=20, repeat=7, min_time=0.02):
+    """
+    Best-of-repeat average time of one call, in milliseconds. number is
+    doubled until one repeat takes min_time, so short calls are not lost in
+    scheduler noise.
+    """
+    timer = timeit.Timer(fn)
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(number=number, repeat=repeat)) / number * 1000
+
+
+def make_display(**kwargs):
+    """LCD_1inch69 on the emulator, initialised and with init traffic discarded"""
+    from hw_drivers.display.LCD_1inch69 import LCD_1inch69
+    from hw_drivers.display.emulator import ST7789Emulator
+    emu = ST7789Emulator()
+    disp = LCD_1inch69(spi=emu, gpio=emu, spi_freq=SPI_FREQ, max_transfer=MAX_TRANSFER, **kwargs)
+    disp.Init()
+    emu.mark_frame()
+    return disp, emu
+
+
+class NullSpi:
+    """SpiDev stand-in that discards data, to time the driver without the emulator"""
+    max_speed_hz = 0
+    mode = 0
+
+    def writebytes(self, data):
+        pass
+
+    def writebytes2(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+@benchmark
+def bench_show_image():
+    from PIL import Image
+    disp, emu = make_display()
+    disp.partial_refresh = False
+    image = Image.new('RGB', (280, 240), (71, 235, 235))
+    disp.ShowImage(image)
+    emu.mark_frame()
+    disp.ShowImage(image)
+    stats = emu.mark_frame()
+
+    disp.SPI = NullSpi()
+    metrics = {
+        'show_image.ms_per_frame': (per_call_ms(lambda: disp.ShowImage(image)), 'timing'),
+        'show_image.pack_ms': (per_call_ms(lambda: disp._pack_rgb565(np.asarray(image))), 'timing'),
+        'show_image.bytes_per_frame': (stats['bytes'], 'model'),
+        'show_image.transfers_per_frame': (stats['transactions'], 'model'),
+        'show_image.spi_ms_per_frame': (stats['time'] * 1000, 'model'),
+    }
+
+    # The same full frame in the reduced and extended pixel formats
+    for fmt in ('rgb444', 'rgb666'):
+        disp, emu = make_display(pixel_format=fmt)
+        disp.partial_refresh = False
+        disp.ShowImage(image)
+        emu.mark_frame()
+        disp.ShowImage(image)
+        stats = emu.mark_frame()
+        disp.SPI = NullSpi()
+        metrics[f'show_image.{fmt}.ms_per_frame'] = (per_call_ms(lambda: disp.ShowImage(image)), 'timing')
+        metrics[f'show_image.{fmt}.bytes_per_frame'] = (stats['bytes'], 'model')
+        metrics[f'show_image.{fmt}.spi_ms_per_frame'] = (stats['time'] * 1000, 'model')
+    return metrics
+
+
+@benchmark
+def bench_scroll():
+    disp, emu = make_display()
+    frame = np.zeros((240, 280), dtype='>u2')
+    disp.ShowFrame(frame)
+    disp.Scroll(0)
+    emu.mark_frame()
+    glance = [8, 16, 24, 30, 24, 16, 8, 0]
+    for offset in glance:
+        disp.Scroll(offset)
+    glance_stats = emu.mark_frame()
+    steps = 0
+    for _ in disp.slide_steps(frame + 1, step=20):
+        steps += 1
+    slide_stats = emu.mark_frame()
+    return {
+        'scroll.glance_bytes_per_frame': (glance_stats['bytes'] / len(glance), 'model'),
+        'scroll.slide_bytes_per_step': (slide_stats['bytes'] / steps, 'model'),
+        'scroll.slide_spi_ms_per_step': (slide_stats['time'] * 1000 / steps, 'model'),
+    }
+
+
+@benchmark
+def bench_dual_display():
+    from hw_drivers.display.LCD_1inch69 import LCD_1inch69
+    from hw_drivers.display.dual_display import DualDisplay
+    from hw_drivers.display.emulator import ST7789Emulator
+    emus = (ST7789Emulator(), ST7789Emulator())
+    # Both eyes on one bus, so modelled time is the two panels' time added up
+    dual = DualDisplay(*(LCD_1inch69(spi=emu, gpio=emu, spi_freq=SPI_FREQ, max_transfer=MAX_TRANSFER)
+                         for emu in emus))
+    dual.Init()
+
+    def pair_stats():
+        stats = [emu.mark_frame() for emu in emus]
+        return {key: sum(s[key] for s in stats) for key in ('bytes', 'transactions', 'time')}
+
+    left = np.zeros((240, 280), dtype='>u2')
+    right = left.copy()
+    pair_stats()
+    dual.ShowFrame((left, right))
+    full = pair_stats()
+    # A blink: only the eye rects change, and the damage is passed in
+    rects = [(40, 80, 120, 160), (160, 80, 240, 160)]
+    for x0, y0, x1, y1 in rects:
+        left[y0:y1, x0:x1] = right[y0:y1, x0:x1] = 0xffff
+    dual.ShowFrame((left, right), rects=rects)
+    damaged = pair_stats()
+    dual.Slide((left + 1, right + 1), fps=1e9)
+    slide = pair_stats()
+    return {
+        'dual.bytes_per_pair': (full['bytes'], 'model'),
+        'dual.transfers_per_pair': (full['transactions'], 'model'),
+        'dual.spi_ms_per_pair': (full['time'] * 1000, 'model'),
+        'dual.damaged_bytes_per_pair': (damaged['bytes'], 'model'),
+        'dual.damaged_transfers_per_pair': (damaged['transactions'], 'model'),
+        'dual.damaged_spi_ms_per_pair': (damaged['time'] * 1000, 'model'),
+        'dual.slide_bytes_per_pair': (slide['bytes'], 'model'),
+        'dual.slide_spi_ms_per_pair': (slide['time'] * 1000, 'model'),
+    }
+
+
+@benchmark
+def bench_tween():
+    from face import robot_face
+    from face.animation import Tween
+    from face.scene import FaceScene
+    tween = Tween(robot_face.EMOTIONS['curious'], robot_face.EMOTIONS['sleepy'], robot_face.TRANSITION_TIME)
+    table = tween.table(robot_face.FPS)
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR)
+
+    def transition():
+        for style in table:
+            scene.set_face(style)
+            scene.render()
+    return {
+        'tween.table_ms': (per_call_ms(lambda: tween.table(robot_face.FPS)), 'timing'),
+        'tween.at_ms': (per_call_ms(lambda: tween.at(0.2), number=200), 'timing'),
+        'tween.frame_ms': (per_call_ms(transition, number=5) / len(table), 'timing'),
+    }
+
+
+@benchmark
+def bench_sdf():
+    from face import robot_face, sdf
+    steps = 17
+    styles = [robot_face.EMOTIONS['normal']] * steps
+    blinks = [i / (steps - 1) for i in range(steps)]
+
+    def batch(antialias):
+        sdf.render_frames(styles, blinks, robot_face.EYE_POSITIONS, robot_face.EYE_COLOR,
+                          robot_face.BG_COLOR, antialias=antialias)
+    return {
+        'sdf.blink_batch_ms': (per_call_ms(lambda: batch(False)), 'timing'),
+        'sdf.blink_batch_aa_ms': (per_call_ms(lambda: batch(True)), 'timing'),
+    }
+
+
+@benchmark
+def bench_scene():
+    from face import robot_face
+    from face.frame_cache import FrameCache
+    from face.scene import FaceScene
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR)
+    normal = robot_face.EMOTIONS['normal']
+    blink = [i / 10 for i in range(11)] + [i / 10 for i in range(10, -1, -1)]
+
+    def tick(progress):
+        scene.set_face(normal, progress)
+        return scene.render()
+
+    def blink_cycle():
+        for progress in blink:
+            tick(progress)
+    tick(0)
+    static_ms = per_call_ms(lambda: tick(0))
+    blink_ms = per_call_ms(blink_cycle, number=5) / len(blink)
+
+    # The same blink with its tiles drawn beforehand in one batch, as FaceLoop does
+    cached = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR, cache=FrameCache())
+    prerender_ms = per_call_ms(lambda: (cached.cache.clear(), cached.prerender_blink(normal)), number=1)
+    cached.prerender_blink(normal)
+
+    def cached_cycle():
+        for progress in blink:
+            cached.set_face(normal, progress)
+            cached.render()
+    cached_ms = per_call_ms(cached_cycle, number=5) / len(blink)
+
+    # The same blink sent with the scene's damage rects instead of a diff
+    disp, emu = make_display()
+    scene.damage((0, 0, scene.width, scene.height))
+    disp.ShowFrame(tick(0)[0])
+    emu.mark_frame()
+    sent = 0
+    for progress in blink:
+        frame, rects = tick(progress)
+        if frame is not None:
+            disp.ShowFrame(frame, rects=rects)
+        sent += emu.mark_frame()['bytes']
+    return {
+        'scene.static_ms': (static_ms, 'timing'),
+        'scene.blink_render_ms': (blink_ms, 'timing'),
+        'scene.cached_blink_render_ms': (cached_ms, 'timing'),
+        'scene.prerender_blink_ms': (prerender_ms, 'timing'),
+        'scene.blink_bytes_per_frame': (sent / len(blink), 'model'),
+    }
+
+
+@benchmark
+def bench_gaze():
+    from face import robot_face
+    from face.gaze import Gaze
+    from face.scene import FaceScene
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR)
+    normal = robot_face.EMOTIONS['normal']
+    # One second of 60 FPS frames following a target that jumps every 0.25 s,
+    # with look_at() updates arriving at 240 Hz in between
+    gaze = Gaze(clock=lambda: 0.0)
+    targets = [(1, 0.5), (-1, -0.5), (0.3, 1), (0, 0)]
+    offsets = []
+    for i in range(240):
+        gaze.look_at(*targets[i // 60], at=i / 240)
+        if i % 4 == 3:
+            offsets.append(gaze.update(i / 240))
+
+    def track():
+        for offset in offsets:
+            scene.set_face(normal, 0, offset)
+            scene.render()
+    scene.set_face(normal, 0)
+    scene.render()
+    frame_ms = per_call_ms(track, number=1) / len(offsets)
+
+    disp, emu = make_display()
+    scene.set_face(normal, 0)
+    scene.damage((0, 0, scene.width, scene.height))
+    disp.ShowFrame(scene.render()[0])
+    emu.mark_frame()
+    sent = 0
+    for offset in offsets:
+        scene.set_face(normal, 0, offset)
+        frame, rects = scene.render()
+        if frame is not None:
+            disp.ShowFrame(frame, rects=rects)
+        sent += emu.mark_frame()['bytes']
+    return {
+        'gaze.frame_ms': (frame_ms, 'timing'),
+        'gaze.bytes_per_frame': (sent / len(offsets), 'model'),
+    }
+
+
+@benchmark
+def bench_headless():
+    from face.headless import render_clip
+    # 20 s of the demo face on the simulated clock, the same every run
+    best = None
+    for _ in range(3):
+        recorder, report = render_clip(20, seed=1)
+        if best is None or report['render_ms_mean'] < best['render_ms_mean']:
+            best = report
+    return {
+        'headless.frames': (best['frames'], 'model'),
+        'headless.recorded_frames': (len(recorder.frames), 'model'),
+        'headless.render_ms': (best['render_ms_mean'], 'timing'),
+    }
+
+
+@benchmark
+def bench_rounded_rect():
+    from hw_drivers.display.canvas import Canvas
+    canvas = Canvas(280, 240)
+    eye = lambda: canvas.rounded_rect((40, 80, 120, 160), 15, (71, 235, 235))
+    return {'rounded_rect.ms': (per_call_ms(eye, number=500), 'timing')}
+
+
+@benchmark
+def bench_trajectory():
+    from trajectory import Trajectory
+    # A whole-body pose: eight leg servos, sampled for a 50 Hz control loop
+    start = [0, 0, 0, 0, 0, 0, 0, 0]
+    end = [-20, 20, -20, 20, 10, -10, 10, -10.5]
+    metrics = {}
+    for profile in ('min_jerk', 'trapezoid'):
+        plan = lambda: Trajectory(start, end, 600, 10000, profile).sample(50)
+        metrics[f'trajectory.{profile}.plan_ms'] = (per_call_ms(plan), 'timing')
+        metrics[f'trajectory.{profile}.ticks'] = (len(plan()), 'model')
+    return metrics
+
+
+def run_motion(fn, reset, stop_after=None, repeat=5):
+    """
+    Run a motion on the simulated clock, calling reset before each run so every
+    run starts from the same pose; return (servo writes, simulated s, best CPU ms)
+    """
+    best = float('inf')
+    for i in range(repeat):
+        with SimClock():
+            reset()
+        servo_log.reset()
+        bus.reset_stats()
+        with SimClock(stop_after) as clock:
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        if i == 0:
+            writes, seconds = servo_log.total(), clock.now
+    return writes, seconds, best * 1000
+
+
+@benchmark
+def bench_walk():
+    from leg_control import QuadrupedController
+    with SimClock():
+        controller = QuadrupedController()
+    seconds = 10
+    writes, _, cpu_ms = run_motion(lambda: controller.walk(speed=1), controller.stand, stop_after=seconds)
+    # Bus counters cover the last run; its writes that changed no pulse width were dropped
+    suppressed = sum(bus.suppressed.values())
+    return {
+        'walk.servo_writes_per_s': (writes / seconds, 'model'),
+        'walk.suppressed_writes_per_s': (suppressed / seconds, 'model'),
+        'walk.cpu_ms_per_s': (cpu_ms / seconds, 'timing'),
+    }
+
+
+@benchmark
+def bench_gait():
+    from gait import CPG, GAITS
+    metrics = {}
+    for name in GAITS:
+        cpg = CPG(name)
+        metrics[f'gait.{name}.step_ms'] = (per_call_ms(lambda: cpg.step(0.02), number=200), 'timing')
+    return metrics
+
+
+@benchmark
+def bench_gait_table():
+    import tempfile
+    import gait_table
+    from leg_control import QuadrupedController
+    with tempfile.TemporaryDirectory() as directory:
+        compile_ms = per_call_ms(lambda: gait_table.compile_cpg('trot', 0.57))
+        classic_ms = per_call_ms(lambda: gait_table.compile_keyframes(gait_table.CLASSIC_WALK))
+        # Once on disk, starting a gait opens the cached file, as a fresh process would
+        load_ms = per_call_ms(lambda: gait_table.gait_table('trot', 0.57, cache=gait_table.GaitCache(directory)))
+
+        default_cache, gait_table.cache = gait_table.cache, gait_table.GaitCache(directory)
+        try:
+            with SimClock():
+                controller = QuadrupedController()
+            seconds = 10
+            _, _, cpu_ms = run_motion(lambda: controller.walk(speed=1, compiled=True), controller.stand,
+                                      stop_after=seconds)
+        finally:
+            gait_table.cache = default_cache
+    return {
+        'gait_table.compile_ms': (compile_ms, 'timing'),
+        'gait_table.classic_compile_ms': (classic_ms, 'timing'),
+        'gait_table.load_ms': (load_ms, 'timing'),
+        'gait_table.walk_cpu_ms_per_s': (cpu_ms / seconds, 'timing'),
+    }
+
+
+@benchmark
+def bench_behaviours():
+    from leg_control import QuadrupedController
+    with SimClock():
+        controller = QuadrupedController()
+    metrics = {}
+    for name in ('happy', 'excited', 'sit', 'stretch', 'greet'):
+        writes, seconds, cpu_ms = run_motion(getattr(controller, name), controller.stand)
+        metrics[f'behaviour.{name}.servo_writes'] = (writes, 'model')
+        metrics[f'behaviour.{name}.seconds'] = (seconds, 'model')
+        metrics[f'behaviour.{name}.cpu_ms'] = (cpu_ms, 'timing')
+    return metrics
+
+
+@benchmark
+def bench_neck():
+    from neck import NeckController
+    with SimClock():
+        neck = NeckController()
+    gestures = {
+        'look_left': lambda: (neck.look_left(), neck.center()),
+        'nod_yes': neck.nod_yes,
+        'nod_no': neck.nod_no,
+        # Centring from a diagonal moves pan and tilt together
+        'look_around': lambda: (neck.look_left(), neck.look_up(), neck.center()),
+    }
+    metrics = {}
+    for name, gesture in gestures.items():
+        writes, seconds, cpu_ms = run_motion(gesture, neck.center)
+        metrics[f'neck.{name}.servo_writes'] = (writes, 'model')
+        metrics[f'neck.{name}.seconds'] = (seconds, 'model')
+        metrics[f'neck.{name}.cpu_ms'] = (cpu_ms, 'timing')
+    return metrics
+
+
+# Importing the display stack (and constructing a display) must not touch hardware
+HARDWARE_MODULES = ('spidev', 'gpiozero', 'RPi', 'robot_hat')
+IMPORT_PROBE = """
+import sys, time
+import numpy
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+{construct}
+print(elapsed * 1000, sum(m in sys.modules for m in {hardware!r}))
+"""
+
+
+def import_cost(module, construct='', repeat=10):
+    """Best-of-repeat import time in a fresh interpreter, with numpy preloaded, and hardware modules loaded"""
+    best, loaded = float('inf'), 0
+    code = IMPORT_PROBE.format(module=module, construct=construct, hardware=HARDWARE_MODULES)
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout.split()
+        best, loaded = min(best, float(out[0])), int(out[1])
+    return best, loaded
+
+
+@benchmark
+def bench_import():
+    display_ms, display_hw = import_cost('hw_drivers.display.LCD_1inch69',
+                                         'hw_drivers.display.LCD_1inch69.LCD_1inch69()')
+    face_ms, face_hw = import_cost('face.robot_face')
+    return {
+        'import.display_ms': (display_ms, 'timing'),
+        'import.face_ms': (face_ms, 'timing'),
+        'import.hardware_modules_loaded': (display_hw + face_hw, 'model'),
+    }
+
+
+def run_all(selected=None, passes=PASSES, results=None):
+    """
+    Run the benchmarks passes times over and keep each timing metric's best,
+    also against earlier results if given. Machine speed drifts over
+    seconds, so spreading the runs out in time rides out a slow spell that
+    back-to-back repeats would all land in.
+    """
+    results = dict(results or {})
+    for _ in range(passes):
+        for fn in BENCHMARKS:
+            if selected and not any(s in fn.__name__ for s in selected):
+                continue
+            for name, (value, kind) in fn().items():
+                value = round(float(value), 4)
+                if kind == 'timing' and name in results:
+                    value = min(value, results[name]['value'])
+                results[name] = {'value': value, 'kind': kind}
+    return results
+
+
+def compare(results, baseline, thresholds=THRESHOLDS):
+    """Return the metrics that got worse than baseline beyond their threshold"""
+    regressions = []
+    print(f"{'metric':44} {'value':>12} {'baseline':>12} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:44} {result['value']:12.4f} {'-':>12} {'new':>8}")
+            continue
+        old, new = base['value'], result['value']
+        change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+        worse = change > thresholds[result['kind']]
+        if result['kind'] == 'timing' and new - old < TIMING_FLOOR_MS:
+            worse = False
+        flag = '  REGRESSED' if worse else ''
+        print(f"{name:44} {new:12.4f} {old:12.4f} {change:+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--update-baseline', action='store_true', help="write results to the baseline file")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON file")
+    parser.add_argument('-k', dest='selected', action='append', help="only run benchmarks whose name contains this")
+    parser.add_argument('--passes', type=int, default=PASSES, help="runs of the suite; timings keep the best")
+    parser.add_argument('--timing-threshold', type=float, default=THRESHOLDS['timing'],
+                        help="fractional slowdown at which a timing metric fails")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.selected, args.passes)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['metrics']
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': platform.machine(), 'python': platform.python_version(),
+                       'metrics': dict(sorted(baseline.items()))}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)['metrics']
+    thresholds = dict(THRESHOLDS, timing=args.timing_threshold)
+    regressions = compare(results, baseline, thresholds)
+    if any(results[name]['kind'] == 'timing' for name in regressions):
+        # A slow spell can outlast a whole run; a real slowdown is still there on a second look
+        print("\nTiming regressed; running again to confirm\n")
+        results = run_all(args.selected, args.passes, results)
+        regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
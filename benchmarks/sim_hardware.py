@@ -0,0 +1,73 @@
+"""Simulated servo and clock backends for running the robot code off-device"""
+import sys
+import time
+import types
+from collections import Counter
+
+
+class ServoLog:
+    """Counts every servo write per channel"""
+    def __init__(self):
+        self.writes = Counter()
+        self.angles = {}
+
+    def total(self):
+        return sum(self.writes.values())
+
+    def reset(self):
+        self.writes.clear()
+
+
+servo_log = ServoLog()
+
+
+class SimServo:
+    """Stand-in for robot_hat.Servo that records writes instead of driving PWM"""
+    def __init__(self, channel):
+        self.channel = channel
+
+    def angle(self, angle):
+        servo_log.writes[self.channel] += 1
+        servo_log.angles[self.channel] = angle
+
+
+class SimMotors:
+    """Stand-in for robot_hat.Motors"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def install_robot_hat():
+    """Register a simulated robot_hat module, so controllers import SimServo"""
+    module = types.ModuleType('robot_hat')
+    module.Servo = SimServo
+    module.Motors = SimMotors
+    sys.modules['robot_hat'] = module
+    return module
+
+
+class SimClock:
+    """
+    Virtual clock: while active, time.sleep returns immediately and advances
+    `now` instead, so behaviours report their real-world duration in no time.
+    With stop_after, the sleep that crosses that virtual time raises
+    KeyboardInterrupt once, which is how blocking loops like walk() stop.
+    """
+    def __init__(self, stop_after=None):
+        self.now = 0.0
+        self.stop_after = stop_after
+        self._sleep = None
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0)
+        if self.stop_after is not None and self.now >= self.stop_after:
+            self.stop_after = None
+            raise KeyboardInterrupt
+
+    def __enter__(self):
+        self._sleep = time.sleep
+        time.sleep = self.sleep
+        return self
+
+    def __exit__(self, *exc):
+        time.sleep = self._sleep
@@ -1,11 +1,11 @@
 import os
 import sys
-import time
 import random
 import logging
-import spidev as SPI
 from hw_drivers.display import LCD_1inch69 as LCD
-from PIL import Image, ImageDraw
+from hw_drivers.display.display_writer import DisplayWriter
+from face.scene import Scene, RoundedRect
+from face.governor import FrameGovernor
 
 # Pin definitions for the display
 RST = 27
@@ -22,6 +22,11 @@ HEIGHT = 280
 DOT_SIZE = 39
 DOT_COLOR = (50, 255, 50)  # Light green
 DOT_SPACING = 80  # Space between dots
+PIXEL_FORMAT = 'rgb444'  # flat colours only, 12-bit sends 25% fewer bytes
+
+# Glances move the dots up or down with the panel's hardware scroll
+GLANCE_DISTANCE = 25    # pixels
+GLANCE_STEP = 5         # pixels per frame
 
 # Calculate center positions for both dots
 CENTER_Y = HEIGHT // 2
@@ -32,39 +37,65 @@ class RobotDisplay:
     def __init__(self):
         # Initialize display
         self.disp = LCD.LCD_1inch69(
-            spi=SPI.SpiDev(bus, device),
+            spi=(bus, device),
             spi_freq=10000000,
             rst=RST,
             dc=DC,
-            bl=BL
+            bl=BL,
+            pixel_format=PIXEL_FORMAT
         )
         self.disp.Init()
         self.disp.clear()
         self.disp.bl_DutyCycle(70)
         
+        # Frames are sent on a background thread while the next one is drawn
+        self.writer = DisplayWriter(self.disp)
+        self.writer.start()
+        
+        # Retained scene of the two dots: only the parts that change are redrawn and sent
+        self.scene = Scene(WIDTH, HEIGHT, (0, 0, 0), in_use=self.writer.in_use)
+        self.dots = [self.scene.add(RoundedRect((0, 0, 0, 0), 0, DOT_COLOR)) for _ in (LEFT_X, RIGHT_X)]
+        
+        # Frames are only drawn when the dots are due to change
+        self.governor = FrameGovernor(max_fps=20)
+        
         # Initialize single blinking state for both dots
-        self.last_blink = time.time()
+        self.last_blink = self.governor.clock()
         self.blink_interval = random.uniform(2.0, 5.0)
         self.is_blinking = False
         self.blink_duration = random.uniform(0.1, 0.3)
+        
+        # Glance state
+        self.last_glance = self.governor.clock()
+        self.glance_interval = random.uniform(3.0, 6.0)
+        self.glance_target = 0
+        self.glance = 0
 
-    def draw_rounded_rectangle(self, draw, coords, radius, fill):
-        """Helper function to draw a rounded rectangle"""
-        x1, y1, x2, y2 = coords
+    def update_glance(self):
+        """Step the scroll offset towards a glance target and back"""
+        current_time = self.governor.clock()
         
-        # Draw the rounded corners
-        draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2], 180, 270, fill=fill)
-        draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2], 270, 360, fill=fill)
-        draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2], 90, 180, fill=fill)
-        draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2], 0, 90, fill=fill)
+        # Pick a new glance up or down, or come back to the centre
+        if current_time - self.last_glance > self.glance_interval:
+            self.last_glance = current_time
+            if self.glance_target:
+                self.glance_target = 0
+                self.glance_interval = random.uniform(3.0, 6.0)
+            else:
+                self.glance_target = random.choice((-GLANCE_DISTANCE, GLANCE_DISTANCE))
+                self.glance_interval = random.uniform(0.5, 1.0)
         
-        # Draw the main rectangles
-        draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill)
-        draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill)
+        step = max(-GLANCE_STEP, min(GLANCE_STEP, self.glance_target - self.glance))
+        if step:
+            self.glance += step
+            self.writer.scroll(self.glance)
+            self.governor.animate()
+        else:
+            self.governor.schedule(self.last_glance + self.glance_interval)
 
     def update_blink(self):
         """Update blink state for both dots"""
-        current_time = time.time()
+        current_time = self.governor.clock()
         
         # Check if it's time to start a new blink
         if not self.is_blinking and current_time - self.last_blink > self.blink_interval:
@@ -78,9 +109,15 @@ class RobotDisplay:
             self.is_blinking = False
             # Set new random interval until next blink
             self.blink_interval = random.uniform(2.0, 5.0)
+        
+        # Next change is the end of this blink or the start of the next one
+        if self.is_blinking:
+            self.governor.schedule(self.last_blink + self.blink_duration)
+        else:
+            self.governor.schedule(self.last_blink + self.blink_interval)
 
-    def draw_single_dot(self, draw, center_x):
-        """Draw a single dot at the specified x position"""
+    def draw_single_dot(self, dot, center_x):
+        """Shape a single dot at the specified x position"""
         x1 = center_x - DOT_SIZE // 2
         y1 = CENTER_Y - DOT_SIZE // 2
         x2 = x1 + DOT_SIZE
@@ -92,45 +129,43 @@ class RobotDisplay:
             y_mid = (y1 + y2) // 2
             y_blink1 = y_mid - blink_height // 2
             y_blink2 = y_mid + blink_height // 2
-            self.draw_rounded_rectangle(draw, 
-                                     [x1, y_blink1, x2, y_blink2],
-                                     blink_height // 2, 
-                                     DOT_COLOR)
+            dot.set(box=(x1, y_blink1, x2, y_blink2), radius=blink_height // 2)
         else:
             # Normal state - draw the full rounded square
-            self.draw_rounded_rectangle(draw, 
-                                     [x1, y1, x2, y2],
-                                     DOT_SIZE // 4, 
-                                     DOT_COLOR)
+            dot.set(box=(x1, y1, x2, y2), radius=DOT_SIZE // 4)
 
     def draw_dots(self):
         """Draw both dots with current blink state"""
         # Update blink state once for both dots
         self.update_blink()
+        self.update_glance()
         
-        # Create new image with black background
-        image = Image.new("RGB", (WIDTH, HEIGHT), (0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # Draw both dots
-        self.draw_single_dot(draw, LEFT_X)
-        self.draw_single_dot(draw, RIGHT_X)
+        # Shape both dots
+        self.draw_single_dot(self.dots[0], LEFT_X)
+        self.draw_single_dot(self.dots[1], RIGHT_X)
         
-        # Display the image
-        self.disp.ShowImage(image)
+        # Redraw only what changed and hand it to the writer thread
+        frame, rects = self.scene.render()
+        if frame is not None:
+            self.writer.submit_frame(frame, rects)
+            self.governor.frame_shown()
 
     def run(self):
         """Main loop to continuously update the display"""
         try:
             while True:
+                # Sleeps until a blink or glance is due, at most 20 FPS while moving
+                self.governor.wait()
                 self.draw_dots()
-                time.sleep(0.05)  # Small delay for smooth animation
                 
         except KeyboardInterrupt:
             self.cleanup()
 
     def cleanup(self):
         """Clean up display resources"""
+        logging.info("Display loop: %.1f FPS, %.1f ms CPU per second",
+                     self.governor.fps(), self.governor.cpu_per_s() * 1000)
+        self.writer.stop()
         self.disp.module_exit()
 
 def main():
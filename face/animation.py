@@ -0,0 +1,65 @@
+import numpy as np
+
+# Tweened eye parameters, in the order of a parameter vector. Pupil offsets
+# are kept per eye so styles with different_pupils blend smoothly.
+PARAMS = ('eye_width', 'eye_height', 'eye_curve', 'pupil_size',
+          'left_pupil_x', 'left_pupil_y', 'right_pupil_x', 'right_pupil_y')
+
+
+# Easing curves map normalised time in [0, 1] to progress, for whole arrays at once
+EASINGS = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t * t,
+    'ease_out': lambda t: 1 - (1 - t) ** 3,
+    'ease_in_out': lambda t: np.where(t < 0.5, 4 * t * t * t, 1 - (2 - 2 * t) ** 3 / 2),
+}
+
+
+def style_vector(style):
+    """EMOTIONS-style dict to a parameter vector"""
+    x, y = style['pupil_offset']
+    rx = -x if style.get('different_pupils') else x
+    return np.array((style['eye_width'], style['eye_height'], style['eye_curve'],
+                     style['pupil_size'], x, y, rx, y), dtype=np.float64)
+
+
+def vector_style(vec):
+    """Parameter vector to a style dict FaceScene.set_face can draw"""
+    v = np.rint(vec).astype(int).tolist()
+    return {
+        'eye_width': v[0],
+        'eye_height': v[1],
+        'eye_curve': v[2],
+        'pupil_size': v[3],
+        'pupil_offset': (v[4], v[5]),
+        'pupil_offsets': ((v[4], v[5]), (v[6], v[7])),
+    }
+
+
+class Tween:
+    """Eased interpolation of every eye parameter from one style to another"""
+    def __init__(self, start, end, duration=0.4, easing='ease_in_out'):
+        self.start = style_vector(start) if isinstance(start, dict) else np.asarray(start, dtype=np.float64)
+        self.end = style_vector(end) if isinstance(end, dict) else np.asarray(end, dtype=np.float64)
+        self.duration = duration
+        self.ease = EASINGS[easing]
+
+    def vectors(self, times):
+        """Parameter vectors at an array of times (seconds), one row per time, in one pass"""
+        t = np.clip(np.asarray(times, dtype=np.float64) / self.duration, 0, 1) if self.duration > 0 \
+            else np.ones(np.shape(times))
+        p = np.asarray(self.ease(t))[..., None]
+        return self.start + (self.end - self.start) * p
+
+    def at(self, elapsed):
+        """Style dict `elapsed` seconds into the tween"""
+        return vector_style(self.vectors(elapsed))
+
+    def table(self, fps):
+        """Style dicts for every frame of the tween at fps, computed together"""
+        frames = max(1, int(np.ceil(self.duration * fps))) + 1
+        return [vector_style(v) for v in self.vectors(np.arange(frames) / fps)]
+
+    def done(self, elapsed):
+        return elapsed >= self.duration
+
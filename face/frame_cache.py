@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+
+class FrameCache:
+    """
+    Least-recently-used store of finished face frames or eye tiles, bounded by
+    a byte budget. They are kept as panel-ready RGB565 arrays (what
+    LCD_1inch69.ShowFrame takes), so showing a cached state costs a dictionary
+    lookup and no drawing. Blink progress is quantised to blink_steps so a
+    blink maps to a few keys. Stored arrays are read-only: they may be on
+    their way to the panel while the same state is shown again.
+    """
+    def __init__(self, budget=4 * 1024 * 1024, blink_steps=16):
+        self.budget = budget
+        self.blink_steps = blink_steps
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+
+    def blink_step(self, progress):
+        """Nearest blink step for a blink_progress in [0, 1]"""
+        return int(round(min(max(progress, 0), 1) * self.blink_steps))
+
+    def blink_progress(self, step):
+        """blink_progress that blink step stands for"""
+        return step / self.blink_steps
+
+    def get(self, key):
+        frame = self._frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def put(self, key, frame):
+        """Store a copy of frame under key, evicting the oldest frames over budget"""
+        frame = frame.copy()
+        frame.flags.writeable = False
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        if frame.nbytes > self.budget:
+            return frame
+        self._frames[key] = frame
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.budget:
+            _, evicted = self._frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+        return frame
+
+    def get_or_render(self, key, render):
+        """Cached frame for key, or the frame render() draws, stored for next time"""
+        frame = self.get(key)
+        if frame is None:
+            frame = self.put(key, render())
+        return frame
+
+    def clear(self):
+        self._frames.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
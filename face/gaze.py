@@ -0,0 +1,72 @@
+import math
+import threading
+import time
+
+GAZE_RANGE = (18, 12)   # pupil travel in pixels at look_at(+-1, +-1)
+SUBPIXEL = 8            # pupil positions are kept to 1/SUBPIXEL of a pixel
+
+
+class Gaze:
+    """
+    Pupil offset that follows look_at() targets smoothly.
+
+    Targets can arrive at any rate from any thread (e.g. camera tracking).
+    Each one is low-pass filtered by its arrival time, so tracking jitter is
+    smoothed the same way whatever the update rate. update() runs once per
+    frame and moves the pupils towards the filtered target with a critically
+    damped spring, solved exactly for the frame's time step, so motion is
+    continuous, frame-rate independent and in sub-pixel steps.
+    """
+    def __init__(self, travel=GAZE_RANGE, smoothing=0.05, response=14.0, clock=time.monotonic):
+        self.travel = travel
+        self.smoothing = smoothing      # target filter time constant, seconds
+        self.response = response        # spring angular frequency, 1/s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._target = [0.0, 0.0]
+        self._target_at = None
+        self._pos = [0.0, 0.0]
+        self._vel = [0.0, 0.0]
+        self._updated_at = None
+        self.moving = False
+
+    def look_at(self, x, y, at=None):
+        """Aim the pupils at (x, y), each in [-1, 1] from the eye centre; right and down are positive"""
+        at = self.clock() if at is None else at
+        target = (max(-1, min(1, x)) * self.travel[0], max(-1, min(1, y)) * self.travel[1])
+        with self._lock:
+            if self._target_at is None:
+                alpha = 1.0
+            else:
+                alpha = 1 - math.exp(-max(at - self._target_at, 0) / self.smoothing) if self.smoothing else 1.0
+            self._target_at = at
+            for i in range(2):
+                self._target[i] += alpha * (target[i] - self._target[i])
+
+    def update(self, now=None):
+        """Advance the pupils to time now and return their (x, y) offset in pixels"""
+        now = self.clock() if now is None else now
+        dt = 0.0 if self._updated_at is None else min(max(now - self._updated_at, 0), 0.25)
+        self._updated_at = now
+        with self._lock:
+            target = list(self._target)
+        w = self.response
+        decay = math.exp(-w * dt)
+        moving = False
+        for i in range(2):
+            x = self._pos[i] - target[i]
+            v = self._vel[i]
+            k = (v + w * x) * dt
+            x, v = (x + k) * decay, (v - w * k) * decay
+            if abs(x) < 0.5 / SUBPIXEL and abs(v) < 1.0:
+                x, v = 0.0, 0.0
+            else:
+                moving = True
+            self._pos[i] = target[i] + x
+            self._vel[i] = v
+        self.moving = moving
+        return self.offset()
+
+    def offset(self):
+        """Current pupil offset, rounded to the sub-pixel grid"""
+        return tuple(round(p * SUBPIXEL) / SUBPIXEL for p in self._pos)
@@ -0,0 +1,95 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class FrameGovernor:
+    """
+    Paces a redraw loop by when the picture next changes instead of a fixed
+    period. Every pass the loop tells the governor when its next visual change
+    is due (schedule(), e.g. the next blink) or that something is moving right
+    now (animate(), e.g. an active tween); wait() then sleeps until the
+    earliest of those, but never runs the loop faster than max_fps. With
+    nothing due the loop sleeps, so an idle face runs at 0 FPS.
+
+    schedule() and animate() may be called from other threads (e.g. a camera
+    tracker calling look_at()); they wake a waiting loop straight away. A
+    sleep passed in (a simulated clock's) replaces that wait and is not cut
+    short.
+
+    frame_shown() counts frames actually sent; fps() and cpu_per_s() report
+    the achieved frame rate and process CPU seconds per wall second over the
+    last `window` seconds.
+    """
+    def __init__(self, max_fps=30, idle_wait=1.0, window=5.0,
+                 clock=time.monotonic, sleep=None, cpu_clock=time.process_time):
+        self.max_fps = max_fps
+        self.idle_wait = idle_wait
+        self.window = window
+        self.clock = clock
+        self.sleep = sleep
+        self.cpu_clock = cpu_clock
+        self.wakeups = 0
+        self.frames = 0
+        self._wake = threading.Condition()     # guards _next and _last
+        self._next = math.inf
+        self._last = -math.inf
+        self._shown = deque()
+        self._samples = deque([(clock(), cpu_clock())])
+
+    def schedule(self, at):
+        """Ask for a pass no later than `at` (a clock() time)"""
+        with self._wake:
+            if at < self._next:
+                self._next = at
+                self._wake.notify()
+
+    def animate(self):
+        """Ask for the next pass as soon as the frame-rate cap allows"""
+        with self._wake:
+            self._next = -math.inf
+            self._wake.notify()
+
+    def wait(self):
+        """Sleep until the next pass is due and return the time it starts"""
+        with self._wake:
+            start = now = self.clock()
+            while True:
+                # Re-read after every wake: another thread may have asked for an earlier pass
+                due = self._next if self._next != math.inf else start + self.idle_wait
+                due = max(due, self._last + 1 / self.max_fps)
+                if due <= now:
+                    break
+                if self.sleep is None:
+                    self._wake.wait(due - now)
+                else:
+                    self.sleep(due - now)
+                now = self.clock()
+            self._last = now
+            self._next = math.inf
+        self.wakeups += 1
+        self._sample(now)
+        return now
+
+    def frame_shown(self):
+        """Count a frame that was actually drawn and sent"""
+        self.frames += 1
+        self._shown.append(self._last)
+
+    def _sample(self, now):
+        self._samples.append((now, self.cpu_clock()))
+        while len(self._samples) > 2 and self._samples[1][0] < now - self.window:
+            self._samples.popleft()
+        while self._shown and self._shown[0] < now - self.window:
+            self._shown.popleft()
+
+    def fps(self):
+        """Frames shown per second over the last window"""
+        span = min(self.window, self._samples[-1][0] - self._samples[0][0])
+        return len(self._shown) / span if span > 0 else 0.0
+
+    def cpu_per_s(self):
+        """Process CPU seconds used per wall-clock second over the last window"""
+        (t0, c0), (t1, c1) = self._samples[0], self._samples[-1]
+        return (c1 - c0) / (t1 - t0) if t1 > t0 else 0.0
@@ -0,0 +1,168 @@
+"""
+Headless face renderer: runs FaceLoop on a simulated clock with a seeded RNG
+and records what the panel would show, so any emotion/blink scenario renders
+faster than real time, the same way every run, with a render time per frame.
+
+    python -m face.headless --seconds 20 --seed 1 --out face.gif
+    python -m face.headless --event 0.5 set_emotion happy --event 2 blink --out clip.npy
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from face.governor import FrameGovernor
+from face import robot_face
+
+
+class VirtualClock:
+    """Clock for FrameGovernor where sleeping moves time on instead of waiting"""
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0)
+
+
+class Recorder:
+    """
+    Display sink that keeps what the panel would show, and when, instead of
+    sending it. Takes ShowFrame and Scroll like an LCD or DisplayWriter; a
+    change of either records a frame, the scroll applied as on the glass.
+    """
+    def __init__(self, clock, width=280):
+        self.clock = clock
+        self.width = width
+        self.frames = []
+        self.times = []
+        self.scroll_offset = 0
+        self._frame = None
+
+    def ShowFrame(self, frame, rects=None):
+        # The caller reuses its buffers, so keep a copy
+        self._frame = np.array(frame)
+        self._record()
+
+    def Scroll(self, offset):
+        offset %= self.width
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            if self._frame is not None:
+                self._record()
+
+    def _record(self):
+        screen = np.roll(self._frame, -self.scroll_offset, axis=1) if self.scroll_offset else self._frame
+        now = self.clock()
+        # Changes at the same moment are one frame on the glass
+        if self.times and self.times[-1] == now:
+            self.frames[-1] = screen
+        else:
+            self.frames.append(screen)
+            self.times.append(now)
+
+    def stack(self):
+        """Recorded frames as an (n, height, width) RGB565 array"""
+        return np.stack(self.frames)
+
+    def rgb(self):
+        """Recorded frames as an (n, height, width, 3) RGB888 array"""
+        v = self.stack().astype(np.uint16)
+        r, g, b = (v >> 11) & 0x1F, (v >> 5) & 0x3F, v & 0x1F
+        return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=-1).astype(np.uint8)
+
+    def save(self, path, end=None):
+        """Write the clip: .npy saves the RGB565 stack, anything else an animated image via PIL"""
+        if path.endswith('.npy'):
+            np.save(path, self.stack())
+            return
+        from PIL import Image
+        end = self.clock() if end is None else end
+        times = self.times + [max(end, self.times[-1] + 0.01)]
+        durations = [max(int(round((b - a) * 1000)), 10) for a, b in zip(times, times[1:])]
+        images = [Image.fromarray(frame) for frame in self.rgb()]
+        images[0].save(path, save_all=True, append_images=images[1:], duration=durations, loop=0)
+
+
+def render_clip(seconds, scenario=(), seed=0, demo=None):
+    """
+    Run the face for `seconds` of simulated time as fast as the CPU allows and
+    return (recorder, report). scenario is a list of (time, FaceLoop method,
+    *args) events, e.g. (1.0, 'set_emotion', 'happy'), (2.0, 'blink') or
+    (2.5, 'look_at', 1, 0). The random demo behaviour runs when there is no
+    scenario, or when demo is True.
+    """
+    clock = VirtualClock()
+    governor = FrameGovernor(max_fps=robot_face.FPS, clock=clock, sleep=clock.sleep)
+    recorder = Recorder(clock)
+    face = robot_face.FaceLoop(recorder, governor, random.Random(seed),
+                               demo=not scenario if demo is None else demo)
+    events = sorted(scenario, key=lambda e: e[0])
+    render_ms = []
+    started = time.perf_counter()
+    while True:
+        if events:
+            governor.schedule(events[0][0])
+        now = governor.wait()
+        if now >= seconds:
+            break
+        while events and events[0][0] <= now:
+            _, action, *args = events.pop(0)
+            getattr(face, action)(*args)
+        if face.step(now):
+            render_ms.append(face.render_ms)
+    clock.now = seconds
+    wall = time.perf_counter() - started
+    return recorder, report(render_ms, seconds, wall, governor.wakeups)
+
+
+def report(render_ms, seconds, wall, passes):
+    """Summary of a headless run; render_ms is the draw time of every frame"""
+    ms = np.array(render_ms) if render_ms else np.zeros(1)
+    return {
+        'frames': len(render_ms),
+        'passes': passes,
+        'seconds': seconds,
+        'wall_seconds': wall,
+        'realtime_factor': seconds / wall if wall > 0 else float('inf'),
+        'render_ms': list(render_ms),
+        'render_ms_mean': float(ms.mean()),
+        'render_ms_p95': float(np.percentile(ms, 95)),
+        'render_ms_max': float(ms.max()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--event', nargs='+', action='append', default=[], metavar='TIME ACTION',
+                        help='scenario event: time, FaceLoop method and its arguments')
+    parser.add_argument('--out', help='write the clip to a .npy, .gif, .webp or .png file')
+    args = parser.parse_args(argv)
+
+    scenario = []
+    for event in args.event:
+        params = []
+        for arg in event[2:]:
+            try:
+                params.append(float(arg))
+            except ValueError:
+                params.append(arg)
+        scenario.append((float(event[0]), event[1], *params))
+
+    recorder, summary = render_clip(args.seconds, scenario, args.seed)
+    print(f"{summary['frames']} frames in {summary['passes']} passes, {summary['seconds']:.1f} s "
+          f"rendered in {summary['wall_seconds']:.2f} s ({summary['realtime_factor']:.0f}x real time)")
+    print(f"render ms per frame: mean {summary['render_ms_mean']:.3f}, "
+          f"p95 {summary['render_ms_p95']:.3f}, max {summary['render_ms_max']:.3f}")
+    if args.out and recorder.frames:
+        recorder.save(args.out, args.seconds)
+        print(f"wrote {len(recorder.frames)} frames to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
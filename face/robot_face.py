@@ -3,9 +3,13 @@ import sys
 import time
 import random
 import logging
-import spidev as SPI
 from hw_drivers.display import LCD_1inch69 as LCD
-from PIL import Image, ImageDraw, ImageFont
+from hw_drivers.display.display_writer import DisplayWriter
+from face.frame_cache import FrameCache
+from face.animation import Tween
+from face.governor import FrameGovernor
+from face.gaze import Gaze
+from face.scene import FaceScene
 import math
 
 # Pin definitions
@@ -15,12 +19,15 @@ BL = 4
 bus = 0
 device = 0
 
-# Logging setup
-logging.basicConfig(level=logging.DEBUG)
-
 # Color definition (Vector uses blue-white color)
 EYE_COLOR = (71, 235, 235)  # Bright cyan color
 BG_COLOR = "BLACK"
+EYE_POSITIONS = ((80, 120), (200, 120))     # eye centres, symmetric about the middle
+ANTIALIAS = True    # smooth eye edges; costs nothing once a blink's tiles are cached
+
+# The face is a few flat colours, so 12-bit colour looks the same and
+# sends a quarter fewer bytes per frame than RGB565
+PIXEL_FORMAT = 'rgb444'
 
 # Vector/Cosmo eye expressions with larger sizes
 EMOTIONS = {
@@ -55,129 +62,220 @@ EMOTIONS = {
     }
 }
 
-def draw_rounded_rectangle(draw, coords, radius, fill):
-    """Draw a rectangle with rounded corners"""
-    x1, y1, x2, y2 = coords
-    
-    # Ensure coordinates are in correct order
-    x1, x2 = min(x1, x2), max(x1, x2)
-    y1, y2 = min(y1, y2), max(y1, y2)
-    
-    # Ensure minimum size
-    if x2 - x1 < 2 * radius:
-        radius = (x2 - x1) // 2
-    if y2 - y1 < 2 * radius:
-        radius = (y2 - y1) // 2
-    
-    if radius <= 0:
-        draw.rectangle([x1, y1, x2, y2], fill=fill)
-        return
-        
-    # Draw main rectangle
-    draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill)
-    draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill)
-    
-    # Draw four corners
-    draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2], 180, 270, fill=fill)
-    draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2], 270, 360, fill=fill)
-    draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2], 90, 180, fill=fill)
-    draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2], 0, 90, fill=fill)
-
-def draw_eyes(disp, emotion='normal', blink_progress=0):
-    try:
-        image = Image.new("RGB", (280, 240), BG_COLOR)
-        draw = ImageDraw.Draw(image)
-        
-        style = EMOTIONS[emotion]
-        
-        # Base eye positions - adjusted for larger eyes
-        left_eye_pos = (80, 120)    # Moved slightly more apart
-        right_eye_pos = (200, 120)  # Moved slightly more apart
-        
-        # Calculate eye height with blink (ensure minimum height)
-        eye_height = max(4, style['eye_height'] * (1 - blink_progress))
-        
-        for i, pos in enumerate([left_eye_pos, right_eye_pos]):
-            # Draw the main eye shape
-            eye_box = (
-                pos[0] - style['eye_width']//2,
-                pos[1] - eye_height//2,
-                pos[0] + style['eye_width']//2,
-                pos[1] + eye_height//2
-            )
-            draw_rounded_rectangle(draw, eye_box, style['eye_curve'], EYE_COLOR)
-            
-            # Draw pupils if not fully blinked
-            if blink_progress < 0.9 and eye_height > 8:
-                pupil_offset = style['pupil_offset']
-                if style.get('different_pupils') and i == 1:
-                    pupil_offset = (-pupil_offset[0], pupil_offset[1])
-                
-                # Scale pupil size with eye height
-                pupil_scale = min(1, eye_height / style['eye_height'])
-                pupil_size = int(style['pupil_size'] * pupil_scale)
-                
-                if pupil_size > 0:
-                    pupil_box = (
-                        pos[0] - pupil_size//2 + pupil_offset[0],
-                        pos[1] - pupil_size//2 + pupil_offset[1],
-                        pos[0] + pupil_size//2 + pupil_offset[0],
-                        pos[1] + pupil_size//2 + pupil_offset[1]
-                    )
-                    draw_rounded_rectangle(draw, pupil_box, min(style['eye_curve']//2, pupil_size//4), BG_COLOR)
-        
-        disp.ShowImage(image)
-        return True
-        
-    except Exception as e:
-        logging.error(f"Error drawing eyes: {e}")
-        return False
+# Frame rate of the face loop, and how long an emotion change takes
+FPS = 30
+TRANSITION_TIME = 0.4   # seconds
+GAZE_FPS = 60           # frame cap while only the pupils are moving
+
+# Glances slide both eyes sideways with the panel's hardware scroll, so they
+# cost a few command bytes per frame instead of a redraw
+GLANCE_DISTANCE = 30    # pixels
+GLANCE_DURATION = 0.8   # seconds, out and back
+
+def glance_offset(elapsed, distance=GLANCE_DISTANCE, duration=GLANCE_DURATION):
+    """Scroll offset `elapsed` seconds into a glance: ease out, hold, ease back"""
+    if elapsed <= 0 or elapsed >= duration:
+        return 0
+    ramp = min(1, 4 * min(elapsed, duration - elapsed) / duration)
+    return int(round(distance * ramp * ramp * (3 - 2 * ramp)))
+
+# Where the pupils look; look_at() moves them smoothly from any thread
+gaze = Gaze()
+
+# The FaceLoop that is running, if any; look_at() goes through it so the
+# loop wakes up for the new target instead of at its next blink
+running = None
+
+def look_at(x, y):
+    """Point both pupils at (x, y), each in [-1, 1]; fine to call at camera rate"""
+    face = running
+    if face is not None:
+        face.look_at(x, y)
+    else:
+        gaze.look_at(x, y)
+
+class FaceLoop:
+    """
+    The face's behaviour and drawing, one pass at a time. Time comes only from
+    governor.clock and randomness only from rng, so with a simulated clock and
+    a seeded random.Random a run is exactly repeatable. Frames go to disp
+    through ShowFrame(frame, rects=...) and Scroll(offset): an LCD, a DisplayWriter
+    or a headless Recorder. With demo=False the face only blinks, changes
+    emotion, glances or looks around when told to.
+    """
+    def __init__(self, disp, governor=None, rng=None, gaze=None, demo=True):
+        self.disp = disp
+        # Redraw only when something is due to change: full rate while the
+        # eyes move, asleep between blinks
+        self.governor = governor or FrameGovernor(max_fps=FPS)
+        self.rng = rng or random.Random()
+        self.gaze = gaze or Gaze(clock=self.governor.clock)
+        self.demo = demo
+        # Retained scene: only what moved is redrawn and sent, a stare costs nothing
+        # A DisplayWriter says which pages it still holds, so they are not drawn over
+        # Blinks are drawn in one batch when they start, then come from the cache
+        self.scene = FaceScene(EYE_POSITIONS, EYE_COLOR, BG_COLOR, antialias=ANTIALIAS,
+                               in_use=getattr(disp, 'in_use', None), cache=FrameCache())
+        self.render_ms = None   # time spent drawing the last pass that made a frame
+        self.stopped = False
+
+        now = self.governor.clock()
+        self.emotion = 'normal'
+        self.tween = None
+        self.tween_start = 0
+        self.blink_duration = 0.15
+        self.blinking = False
+        self.glance_start = -GLANCE_DURATION
+        self.glance_distance = 0
+        self.next_blink = now + self.rng.uniform(2.5, 4.0) if demo else math.inf
+        self.next_emotion = now + 5 if demo else math.inf
+        self.next_glance = now + self.rng.uniform(3.0, 6.0) if demo else math.inf
+        self.next_look = now + self.rng.uniform(1.5, 4.0) if demo else math.inf
+        self.next_report = now + 10
+        # Draw the first face straight away
+        self.governor.animate()
+
+    def set_emotion(self, emotion, now=None):
+        """Tween to an emotion, from wherever the eyes are now, even mid-transition"""
+        now = self.governor.clock() if now is None else now
+        start = self.tween.vectors(now - self.tween_start) if self.tween else EMOTIONS[self.emotion]
+        self.emotion = emotion
+        self.tween = Tween(start, EMOTIONS[emotion], TRANSITION_TIME)
+        self.tween_start = now
+        self.governor.animate()
+        logging.info("Changed emotion to: %s", emotion)
+
+    def blink(self, now=None):
+        self.next_blink = self.governor.clock() if now is None else now
+        self.governor.schedule(self.next_blink)
+
+    def glance(self, distance, now=None):
+        """Slide the whole face `distance` pixels sideways and back"""
+        self.glance_start = self.governor.clock() if now is None else now
+        self.glance_distance = distance
+        self.governor.animate()
+
+    def look_at(self, x, y):
+        self.gaze.look_at(x, y)
+        self.governor.animate()
+
+    def step(self, now):
+        """Update everything for time now and draw; return True if a frame was sent"""
+        governor = self.governor
+        rng = self.rng
+
+        # Blink handling
+        blink_progress = 0
+        blinking = now >= self.next_blink
+        if blinking:
+            blink_progress = min(1, (now - self.next_blink) / self.blink_duration)
+            if blink_progress >= 1:
+                self.next_blink = now + rng.uniform(2.5, 4.0) if self.demo else math.inf
+            # Closing, or just closed and about to open again
+            governor.animate()
+        governor.schedule(self.next_blink)
+
+        # Change emotion every 5 seconds for demo
+        if now >= self.next_emotion:
+            self.set_emotion(rng.choice(list(EMOTIONS.keys())), now)
+            self.next_emotion = now + 5
+        governor.schedule(self.next_emotion)
+
+        style = None
+        if self.tween:
+            if self.tween.done(now - self.tween_start):
+                self.tween = None
+            else:
+                style = self.tween.at(now - self.tween_start)
+            # One more pass after the end draws the final pose
+            governor.animate()
+
+        # Glance left or right now and then
+        if now >= self.next_glance:
+            self.glance(rng.choice((-GLANCE_DISTANCE, GLANCE_DISTANCE)), now)
+            self.next_glance = now + rng.uniform(3.0, 6.0)
+        if now - self.glance_start < GLANCE_DURATION:
+            governor.animate()
+        self.disp.Scroll(glance_offset(now - self.glance_start, self.glance_distance))
+        governor.schedule(self.next_glance)
+
+        # Wander the gaze now and then; a tracker calling look_at() works the same way
+        if now >= self.next_look:
+            self.gaze.look_at(rng.uniform(-1, 1), rng.uniform(-0.6, 0.6), at=now)
+            self.next_look = now + rng.uniform(1.5, 4.0)
+        governor.schedule(self.next_look)
+        gaze_offset = self.gaze.update(now)
+        # Pupil moves only redraw the pupils, so they get a higher frame cap
+        governor.max_fps = GAZE_FPS if self.gaze.moving else FPS
+        if self.gaze.moving:
+            governor.animate()
+
+        started = time.perf_counter()
+        face = style or EMOTIONS[self.emotion]
+        if blinking and not self.blinking:
+            self.scene.prerender_blink(face, gaze_offset)
+        self.blinking = blinking
+        self.scene.set_face(face, blink_progress, gaze_offset)
+        frame, rects = self.scene.render()
+        shown = frame is not None
+        if shown:
+            self.render_ms = (time.perf_counter() - started) * 1000
+            self.disp.ShowFrame(frame, rects=rects)
+            governor.frame_shown()
+
+        if now >= self.next_report:
+            logging.debug("Face loop: %.1f FPS, %.1f ms CPU per second",
+                          governor.fps(), governor.cpu_per_s() * 1000)
+            self.next_report = now + 10
+        governor.schedule(self.next_report)
+        return shown
+
+    def run(self):
+        """Run until stop(); meanwhile the module-level look_at() steers this face"""
+        global running
+        running = self
+        try:
+            while not self.stopped:
+                self.step(self.governor.wait())
+        finally:
+            if running is self:
+                running = None
+
+    def stop(self):
+        """End run() after the pass in progress; safe to call from any thread"""
+        self.stopped = True
+        self.governor.animate()
 
 def main():
+    # Logging setup
+    logging.basicConfig(level=logging.DEBUG)
     try:
         disp = LCD.LCD_1inch69(
-            spi=SPI.SpiDev(bus, device),
+            spi=(bus, device),
             spi_freq=10000000,
             rst=RST,
             dc=DC,
-            bl=BL
+            bl=BL,
+            pixel_format=PIXEL_FORMAT
         )
         
         disp.Init()
         disp.clear()
         disp.bl_DutyCycle(70)
         
-        last_blink = time.time()
-        blink_duration = 0.15
-        current_emotion = 'normal'
-        emotion_change_time = time.time()
+        # Send frames on a background thread while the next one is drawn
+        writer = DisplayWriter(disp)
+        writer.start()
         
-        while True:
-            current_time = time.time()
-            
-            # Blink handling
-            if current_time - last_blink > random.uniform(2.5, 4.0):
-                blink_progress = min(1, (current_time - last_blink - 2.5) / blink_duration)
-                if blink_progress >= 1:
-                    last_blink = current_time
-            else:
-                blink_progress = 0
-            
-            # Change emotion every 5 seconds for demo
-            if current_time - emotion_change_time > 5:
-                current_emotion = random.choice(list(EMOTIONS.keys()))
-                emotion_change_time = current_time
-                print(f"Changed emotion to: {current_emotion}")
-            
-            draw_eyes(disp, current_emotion, blink_progress)
-            time.sleep(0.05)
+        FaceLoop(writer, gaze=gaze).run()
             
     except IOError as e:
         logging.info(e)
     except KeyboardInterrupt:
+        writer.stop()
         disp.module_exit()
         logging.info("quit:")
         exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,255 @@
+import math
+
+import numpy as np
+
+from hw_drivers.display.canvas import Canvas
+from face import sdf
+
+
+def _merge(rects, limit=8):
+    """Merge overlapping half-open rects; past limit, fall back to their bounding box"""
+    rects = [list(r) for r in rects]
+    i = 0
+    while i < len(rects):
+        a = rects[i]
+        for j in range(i + 1, len(rects)):
+            b = rects[j]
+            if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                a[:] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                del rects[j]
+                i = -1
+                break
+        i += 1
+    if len(rects) > limit:
+        rects = [[min(r[0] for r in rects), min(r[1] for r in rects),
+                  max(r[2] for r in rects), max(r[3] for r in rects)]]
+    return [tuple(r) for r in rects]
+
+
+def _box_bounds(box, pad=0):
+    """Half-open pixel bounds of a PIL-style inclusive box, grown by pad"""
+    x1, y1, x2, y2 = box
+    return (math.floor(x1) - pad, math.floor(y1) - pad, math.floor(x2) + 1 + pad, math.floor(y2) + 1 + pad)
+
+
+class Node:
+    """
+    Something drawn in a Scene. Properties (visible included) are changed
+    through set(), which damages the area the node covered before and the
+    area it covers after.
+    """
+    def __init__(self, visible=True, **props):
+        self.scene = None
+        self.visible = visible
+        self.__dict__.update(props)
+
+    def bounds(self):
+        """Half-open (x0, y0, x1, y1) area the node draws in"""
+        raise NotImplementedError
+
+    def draw(self, canvas):
+        """Draw the node; canvas is clipped to the area being redrawn"""
+        raise NotImplementedError
+
+    def set(self, **props):
+        """Change properties, damaging the old and new bounds if anything changed"""
+        changed = {k: v for k, v in props.items() if getattr(self, k) != v}
+        if not changed:
+            return
+        if self.scene is not None and self.visible:
+            self.scene.damage(self.bounds())
+        self.__dict__.update(changed)
+        if self.scene is not None and self.visible:
+            self.scene.damage(self.bounds())
+
+
+class RoundedRect(Node):
+    """Filled rectangle with rounded corners; box is PIL-style (x1, y1, x2, y2), both ends included"""
+    def __init__(self, box, radius, color, antialias=False, **props):
+        super().__init__(box=tuple(box), radius=radius, color=color, antialias=antialias, **props)
+
+    def bounds(self):
+        return _box_bounds(self.box, 1 if self.antialias else 0)
+
+    def draw(self, canvas):
+        if not self.antialias:
+            canvas.rounded_rect(self.box, self.radius, self.color)
+            return
+        # Coverage from the signed distance, only over the part being redrawn
+        x0, y0, x1, y1 = self.bounds()
+        if canvas.clip is not None:
+            cx0, cy0, cx1, cy1 = canvas.clip
+            x0, y0, x1, y1 = max(x0, cx0), max(y0, cy0), min(x1, cx1), min(y1, cy1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        xs = np.arange(x0, x1, dtype=np.float32)[None, :]
+        ys = np.arange(y0, y1, dtype=np.float32)[:, None]
+        radius = sdf._corner_radius(self.box, self.radius)
+        alpha = np.clip(0.5 - sdf.rounded_box_sdf(xs, ys, self.box, radius), 0, 1)
+        canvas.blend(x0, y0, alpha, self.color)
+
+
+class Tile(Node):
+    """
+    Ready-made RGB565 pixels over window, a half-open (x0, y0, x1, y1).
+    Pixels are replaced with show() rather than set().
+    """
+    def __init__(self, window=(0, 0, 0, 0), pixels=None, **props):
+        super().__init__(window=tuple(window), pixels=pixels, **props)
+
+    def bounds(self):
+        return self.window
+
+    def draw(self, canvas):
+        canvas.blit(self.pixels, self.window[0], self.window[1])
+
+    def show(self, window, pixels, damage=None):
+        """
+        Show pixels over window, damaging the old and new windows, or only the
+        rects in damage when the caller knows the rest of the tile is the same
+        """
+        if self.scene is not None:
+            if damage is None:
+                damage = [self.window, window] if self.visible else [window]
+            for rect in damage:
+                self.scene.damage(rect)
+        self.window, self.pixels, self.visible = tuple(window), pixels, True
+
+
+class Scene:
+    """
+    Retained set of nodes drawn in order over a background colour.
+    Changing a node only damages its old and new bounds; render() redraws
+    just the damaged areas and reports them, so the display sends only those
+    windows, and a scene where nothing changed costs nothing to render.
+    Drawing rotates through pages like Canvas, skipping pages in_use reports
+    are still with the display; every page keeps the damage it has not
+    caught up with yet.
+    """
+    def __init__(self, width, height, bg, pages=3, in_use=None):
+        self.width = width
+        self.height = height
+        self.bg = bg
+        self.nodes = []
+        self.canvas = Canvas(width, height, pages=pages, in_use=in_use)
+        self._damage = []
+        self._page_damage = [[] for _ in range(pages)]
+        self.damage((0, 0, width, height))
+
+    def add(self, node):
+        node.scene = self
+        self.nodes.append(node)
+        if node.visible:
+            self.damage(node.bounds())
+        return node
+
+    def damage(self, rect):
+        """Mark a half-open (x0, y0, x1, y1) area as needing a redraw"""
+        x0, y0, x1, y1 = rect
+        rect = (max(x0, 0), max(y0, 0), min(x1, self.width), min(y1, self.height))
+        if rect[0] < rect[2] and rect[1] < rect[3]:
+            self._damage.append(rect)
+            for pending in self._page_damage:
+                pending.append(rect)
+
+    def render(self):
+        """Redraw what changed; return (frame, damaged rects), or (None, []) when nothing did"""
+        if not self._damage:
+            return None, []
+        damage = _merge(self._damage)
+        self._damage = []
+
+        canvas = self.canvas
+        page = canvas._page
+        for rect in _merge(self._page_damage[page]):
+            canvas.set_clip(rect)
+            canvas.fill(self.bg)
+            x0, y0, x1, y1 = rect
+            for node in self.nodes:
+                if not node.visible:
+                    continue
+                nx0, ny0, nx1, ny1 = node.bounds()
+                if nx0 < x1 and x0 < nx1 and ny0 < y1 and y0 < ny1:
+                    node.draw(canvas)
+        canvas.set_clip(None)
+        self._page_damage[page] = []
+        return canvas.flip(), damage
+
+
+class FaceScene(Scene):
+    """
+    The two eyes, pupils cut out, as tiles from the SDF rasteriser
+    (sdf.eye_tiles, so the second eye is usually the first one mirrored),
+    posed with set_face(). With a FrameCache, blink progress is quantised to
+    its blink steps and eye tiles already in the cache (see prerender_blink)
+    are shown without drawing.
+    """
+    def __init__(self, positions, eye_color, bg, width=280, height=240, antialias=True, pages=3,
+                 in_use=None, cache=None):
+        super().__init__(width, height, bg, pages, in_use)
+        self.positions = positions
+        self.eye_color = eye_color
+        self.antialias = antialias
+        self.cache = cache
+        self.eyes = [self.add(Tile(visible=False)) for _ in positions]
+        self.shapes = [None] * len(positions)   # sdf.eye_shapes() of what the eyes show
+
+    def eye_shapes(self, style, blink_progress=0, gaze=(0, 0)):
+        """sdf.eye_shapes() of each eye for a pose, with both pupils moved by gaze"""
+        if gaze != (0, 0):
+            style = dict(style, pupil_offsets=tuple(
+                (x + gaze[0], y + gaze[1]) for x, y in (sdf.pupil_offset(style, i) for i in range(2))))
+        return [sdf.eye_shapes(style, blink_progress, pos, i) for i, pos in enumerate(self.positions)]
+
+    def set_face(self, style, blink_progress=0, gaze=(0, 0)):
+        """
+        Pose the eyes for an EMOTIONS-style dict and blink progress, with both
+        pupils moved by a gaze (x, y) offset in (sub-)pixels. Moving only the
+        gaze damages just the pupils' old and new areas.
+        """
+        cache = self.cache
+        if cache is not None:
+            blink_progress = cache.blink_progress(cache.blink_step(blink_progress))
+        shapes = self.eye_shapes(style, blink_progress, gaze)
+        if shapes == self.shapes:
+            return
+        tiles = [cache.get((i, shape)) if cache is not None else None for i, shape in enumerate(shapes)]
+        if any(pixels is None for pixels in tiles):
+            tiles = [pixels[0] for _, pixels in sdf.eye_tiles(
+                [shapes[0]], [shapes[1]], self.positions, self.eye_color, self.bg,
+                self.width, self.height, self.antialias)]
+        for i, (shape, pixels) in enumerate(zip(shapes, tiles)):
+            self._show(i, shape, self._window(shape), pixels)
+
+    def prerender_blink(self, style, gaze=(0, 0)):
+        """
+        Draw every blink step of a pose in one batch into the cache, keyed by
+        eye shape, so the blink itself is shown without drawing
+        """
+        cache = self.cache
+        poses = [self.eye_shapes(style, cache.blink_progress(step), gaze)
+                 for step in range(cache.blink_steps + 1)]
+        if all((i, shape) in cache for pose in poses for i, shape in enumerate(pose)):
+            return
+        tiles = sdf.eye_tiles([pose[0] for pose in poses], [pose[1] for pose in poses], self.positions,
+                              self.eye_color, self.bg, self.width, self.height, self.antialias)
+        for i, ((wx0, wy0, _, _), pixels) in enumerate(tiles):
+            for pose, tile in zip(poses, pixels):
+                # The batch shares one window; each pose keeps just its own
+                x0, y0, x1, y1 = self._window(pose[i])
+                cache.put((i, pose[i]), tile[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0])
+
+    def _window(self, shape):
+        return sdf._window([shape], self.width, self.height, 1 if self.antialias else 0)
+
+    def _show(self, i, shape, window, pixels):
+        """Put eye i's tile up, damaging only the pupils when nothing else about the eye changed"""
+        old, eye = self.shapes[i], self.eyes[i]
+        if shape == old:
+            return
+        damage = None
+        if old is not None and old[:2] == shape[:2] and eye.window == tuple(window):
+            # The pupil cut reaches a pixel past its box, antialiased or not
+            damage = [_box_bounds(pupil[0], 1) for pupil in (old[2], shape[2]) if pupil]
+        eye.show(window, pixels, damage)
+        self.shapes[i] = shape
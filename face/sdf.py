@@ -0,0 +1,221 @@
+"""
+Signed-distance rasteriser for the face: rounded-rectangle eyes with
+rounded-rectangle pupils cut out of them, for a whole batch of frames
+(e.g. every step of a blink) in one set of NumPy operations. eye_tiles()
+gives each eye as a tile (FaceScene draws these), render_frames() whole
+frames.
+
+Only the area around the first eye is rasterised. The second eye is that
+tile mirrored when the expression is symmetric, copied when both eyes are
+identical, and rasterised on its own only otherwise. Antialiased edges come
+from the distance field itself (coverage = 0.5 - distance), quantised to a
+few levels and turned into colours with one palette lookup.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+AA_LEVELS = 16      # coverage levels of antialiased edges
+
+
+def rounded_box_sdf(x, y, boxes, radius):
+    """
+    Signed distance from pixel centres (x, y) to PIL-style inclusive boxes
+    (x1, y1, x2, y2) with rounded corners, negative inside. boxes and radius
+    broadcast against x and y, e.g. (n, 1, 1) per-frame values over a (h, w) grid.
+    """
+    x1, y1, x2, y2 = boxes
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    hw, hh = (x2 - x1) / 2 + 0.5, (y2 - y1) / 2 + 0.5
+    # Per-axis terms stay at their broadcast shape; only the sums are full size
+    qx = np.abs(x - cx) - hw + radius
+    qy = np.abs(y - cy) - hh + radius
+    ox, oy = np.maximum(qx, 0), np.maximum(qy, 0)
+    d = np.sqrt(ox * ox + oy * oy)
+    d += np.minimum(np.maximum(qx, qy), 0)
+    d -= radius
+    return d
+
+
+def _corner_radius(box, radius):
+    """Clamp a corner radius the way Canvas.rounded_rect does"""
+    x1, y1, x2, y2 = box
+    return max(min(radius, (x2 - x1) // 2, (y2 - y1) // 2), 0)
+
+
+def pupil_offset(style, eye):
+    """Pupil offset of eye 0 (left) or 1 (right) in an EMOTIONS-style dict"""
+    if 'pupil_offsets' in style:
+        return style['pupil_offsets'][eye]
+    x, y = style['pupil_offset']
+    if style.get('different_pupils') and eye == 1:
+        return (-x, y)
+    return (x, y)
+
+
+def eye_shapes(style, blink_progress, pos, eye):
+    """Eye box, eye radius, pupil box and pupil radius (None without a pupil) for one eye"""
+    eye_height = max(4, style['eye_height'] * (1 - blink_progress))
+    eye_box = (pos[0] - style['eye_width'] // 2, pos[1] - eye_height // 2,
+               pos[0] + style['eye_width'] // 2, pos[1] + eye_height // 2)
+    pupil = None
+    if blink_progress < 0.9 and eye_height > 8:
+        offset = pupil_offset(style, eye)
+        size = int(style['pupil_size'] * min(1, eye_height / style['eye_height']))
+        if size > 0:
+            box = (pos[0] - size // 2 + offset[0], pos[1] - size // 2 + offset[1],
+                   pos[0] + size // 2 + offset[0], pos[1] + size // 2 + offset[1])
+            pupil = (box, min(style['eye_curve'] // 2, size // 4))
+    return eye_box, style['eye_curve'], pupil
+
+
+def _eye_arrays(shapes):
+    """Stack per-frame eye shapes into (4, n, 1, 1) boxes and (n, 1, 1) radii"""
+    n = len(shapes)
+    eye = np.array([s[0] for s in shapes], dtype=np.float32)
+    eye_r = np.array([_corner_radius(s[0], s[1]) for s in shapes], dtype=np.float32)
+    pupil = np.array([s[2][0] if s[2] else (0, 0, -2, -2) for s in shapes], dtype=np.float32)
+    pupil_r = np.array([_corner_radius(*s[2]) if s[2] else 0 for s in shapes], dtype=np.float32)
+    shape = (n, 1, 1)
+    return (eye.T.reshape(4, *shape), eye_r.reshape(shape),
+            pupil.T.reshape(4, *shape), pupil_r.reshape(shape))
+
+
+def _coverage(distance, antialias):
+    if antialias:
+        return np.clip(0.5 - distance, 0, 1)
+    return distance < 0
+
+
+def _rasterise(shapes, window, antialias):
+    """Eye-colour weight of every pixel of window = (x0, y0, x1, y1) for each frame"""
+    x0, y0, x1, y1 = window
+    xs = np.arange(x0, x1, dtype=np.float32)[None, None, :]
+    ys = np.arange(y0, y1, dtype=np.float32)[None, :, None]
+    eye, eye_r, pupil, pupil_r = _eye_arrays(shapes)
+    weight = _coverage(rounded_box_sdf(xs, ys, eye, eye_r), antialias)
+
+    # Pupils are only rasterised over the part of the window they can cover
+    pupils = [s[2][0] for s in shapes if s[2]]
+    if not pupils:
+        return weight
+    px0, py0 = max(min(b[0] for b in pupils) - 1, x0), max(min(b[1] for b in pupils) - 1, y0)
+    px1, py1 = min(max(b[2] for b in pupils) + 2, x1), min(max(b[3] for b in pupils) + 2, y1)
+    if px0 >= px1 or py0 >= py1:
+        return weight
+    px0, py0, px1, py1 = int(px0), int(py0), int(px1), int(py1)
+    cut = _coverage(rounded_box_sdf(xs[..., px0 - x0:px1 - x0], ys[:, py0 - y0:py1 - y0],
+                                    pupil, pupil_r), antialias)
+    area = weight[:, py0 - y0:py1 - y0, px0 - x0:px1 - x0]
+    if antialias:
+        area *= 1 - cut
+    else:
+        area &= ~cut
+    return weight
+
+
+def _window(shapes, width, height, pad):
+    """Bounding window of every eye box in the batch, clipped to the frame"""
+    boxes = np.array([s[0] for s in shapes])
+    return (max(int(boxes[:, 0].min()) - pad, 0), max(int(boxes[:, 1].min()) - pad, 0),
+            min(int(boxes[:, 2].max()) + 1 + pad, width), min(int(boxes[:, 3].max()) + 1 + pad, height))
+
+
+def _mirrored(shapes, other, axis2):
+    """True if every shape in other is shapes reflected about x = axis2 / 2"""
+    def flip(box):
+        return (axis2 - box[2], box[1], axis2 - box[0], box[3])
+    for (eye, r, pupil), (eye2, r2, pupil2) in zip(shapes, other):
+        if flip(eye) != eye2 or r != r2 or (pupil is None) != (pupil2 is None):
+            return False
+        if pupil and (flip(pupil[0]) != pupil2[0] or pupil[1] != pupil2[1]):
+            return False
+    return True
+
+
+def _shifted(shapes, other, dx):
+    """True if every shape in other is shapes moved dx to the right"""
+    def move(box):
+        return (box[0] + dx, box[1], box[2] + dx, box[3])
+    for (eye, r, pupil), (eye2, r2, pupil2) in zip(shapes, other):
+        if move(eye) != eye2 or r != r2 or (pupil is None) != (pupil2 is None):
+            return False
+        if pupil and (move(pupil[0]) != pupil2[0] or pupil[1] != pupil2[1]):
+            return False
+    return True
+
+
+def _tiles(shapes, window, palette, antialias):
+    """RGB565 tiles of window for each frame's eye shapes"""
+    weight = _rasterise(shapes, window, antialias)
+    levels = len(palette) - 1
+    return palette[np.rint(weight * levels).astype(np.intp) if antialias else weight.astype(np.intp)]
+
+
+def eye_tiles(left, right, positions, eye_color, bg_color, width=280, height=240, antialias=False):
+    """
+    RGB565 tiles of both eyes for a batch of poses; left and right are the
+    eye_shapes() of each pose. Returns a (window, tiles) pair per eye, tiles
+    being an (n, h, w) array over the half-open window (x0, y0, x1, y1).
+    The second eye reuses the first eye's tiles, mirrored or shifted, when
+    its shapes allow it.
+    """
+    palette = _palette(eye_color, bg_color, AA_LEVELS if antialias else 1)
+    pad = 1 if antialias else 0
+    lx0, ly0, lx1, ly1 = window = _window(left, width, height, pad)
+    tiles = _tiles(left, window, palette, antialias)
+
+    axis2 = positions[0][0] + positions[1][0]
+    dx = positions[1][0] - positions[0][0]
+    other = _window(right, width, height, pad)
+    if _mirrored(left, right, axis2) and other == (axis2 - lx1 + 1, ly0, axis2 - lx0 + 1, ly1):
+        second = tiles[:, :, ::-1]
+    elif _shifted(left, right, dx) and other == (lx0 + dx, ly0, lx1 + dx, ly1):
+        second = tiles
+    else:
+        second = _tiles(right, other, palette, antialias)
+    return (window, tiles), (other, second)
+
+
+def render_frames(styles, blinks, positions, eye_color, bg_color, width=280, height=240,
+                  antialias=False, out=None):
+    """
+    Render len(styles) face frames as an (n, height, width) RGB565 array in
+    display byte order. styles are EMOTIONS-style dicts, blinks the matching
+    blink_progress values and positions the two eye centres. out, if given,
+    is filled in place instead.
+    """
+    n = len(styles)
+    if out is None:
+        out = np.empty((n, height, width), dtype='>u2')
+    bg = _palette(eye_color, bg_color, AA_LEVELS if antialias else 1)[0]
+    out[...] = bg
+
+    left = [eye_shapes(s, b, positions[0], 0) for s, b in zip(styles, blinks)]
+    right = [eye_shapes(s, b, positions[1], 1) for s, b in zip(styles, blinks)]
+    ((lx0, ly0, lx1, ly1), tiles), ((rx0, ry0, rx1, ry1), second) = eye_tiles(
+        left, right, positions, eye_color, bg_color, width, height, antialias)
+    out[:, ly0:ly1, lx0:lx1] = tiles
+    region = out[:, ry0:ry1, rx0:rx1]
+    if rx0 >= lx1 or lx0 >= rx1 or ry0 >= ly1 or ly0 >= ry1:
+        region[...] = second
+    else:
+        # Keep the first eye where the two windows overlap
+        np.copyto(region, second, where=second != bg)
+    return out
+
+
+@lru_cache(maxsize=16)
+def _palette(eye_color, bg_color, levels):
+    """RGB565 colour of each eye-colour weight level from 0 (background) to levels (eye)"""
+    bg, fg = np.array(_rgb(bg_color)), np.array(_rgb(eye_color))
+    mix = np.rint(bg + (fg - bg) * (np.arange(levels + 1) / levels)[:, None]).astype(np.uint16)
+    palette = ((mix[:, 0] & 0xF8) << 8) | ((mix[:, 1] & 0xFC) << 3) | (mix[:, 2] >> 3)
+    return palette.astype('>u2')
+
+
+def _rgb(color):
+    if isinstance(color, str):
+        from PIL import ImageColor
+        return ImageColor.getrgb(color)[:3]
+    return tuple(color[:3])
@@ -0,0 +1,103 @@
+"""
+Central pattern generator for the four Theo Jansen legs.
+
+Each leg is a phase oscillator. The oscillators are coupled (Kuramoto
+style) towards the phase offsets of a gait pattern, so switching pattern,
+speed, stride or duty factor mid-stride blends into the new gait instead of
+restarting it. A leg's phase maps to its (inner, outer) servo angles:
+stance sweeps the foot back along the ground, swing lifts it and brings it
+forward again. Setpoints for all eight servos come out of one vectorised
+step per control tick.
+"""
+import math
+
+import numpy as np
+
+# Legs in QuadrupedController.legs order
+LEGS = ('front_right', 'front_left', 'back_right', 'back_left')
+
+# Phase offset of each leg, in cycles
+GAITS = {
+    'trot': (0.0, 0.5, 0.5, 0.0),       # diagonal pairs together, as walk() always did
+    'pace': (0.0, 0.5, 0.0, 0.5),       # same-side pairs together
+    'bound': (0.0, 0.0, 0.5, 0.5),      # front pair, then back pair
+    'walk': (0.0, 0.5, 0.75, 0.25),     # one leg at a time: FR, BL, FL, BR
+}
+
+# Leg angles from walk()'s phases: forward (lift) at (15, 5), pushed back at (-15, -25)
+MID = np.array((0.0, -10.0))        # (inner, outer) halfway through the stroke
+HALF_STROKE = np.array((15.0, 15.0))    # from MID to the front of the stroke at stride 1
+LIFT = np.array((0.0, 10.0))        # extra at the top of the swing at stride 1
+
+CYCLES_PER_SPEED = 0.57     # walk(speed) took about 1.75 / speed seconds per cycle
+
+# Fraction of the way towards the new offsets the legs are moved on a gait
+# change. Half a cycle apart is where the coupling pulls neither way, and
+# trot, pace and bound are all that far from each other, so without a nudge
+# the legs would stay in the old gait.
+SWITCH_NUDGE = 0.05
+
+
+def leg_angles(phase, stride, duty):
+    """(..., 2) (inner, outer) leg angles for leg phases of any shape, in cycles"""
+    duty = min(max(duty, 0.05), 0.95)
+    p = np.asarray(phase) % 1.0
+    stance = p < duty
+    swing = np.clip((p - duty) / (1 - duty), 0, 1)
+    # Stance: front to back at constant speed; swing: eased back to the front, lifted
+    x = np.where(stance, 1 - 2 * p / duty, -np.cos(math.pi * swing))
+    lift = np.where(stance, 0.0, np.sin(math.pi * swing))
+    return MID + stride * (x[..., None] * HALF_STROKE + lift[..., None] * LIFT)
+
+
+class CPG:
+    """
+    Phase-coupled oscillators for the four legs. frequency (cycles/s),
+    stride (stroke scale, 1 = walk()'s), duty (fraction of a cycle on the
+    ground) and the gait pattern can all be changed at any time; stride and
+    duty glide to new values over `smoothing` seconds, the stride from zero
+    at the start.
+    """
+    def __init__(self, gait='trot', frequency=CYCLES_PER_SPEED, stride=1.0, duty=0.6,
+                 coupling=4.0, smoothing=0.3):
+        self.frequency = frequency
+        self.stride = stride
+        self.duty = duty
+        self.coupling = coupling
+        self.smoothing = smoothing
+        self.set_gait(gait)
+        self.phase = self.offsets.copy()
+        # Glide up from standing still, as stopping glides down to it
+        self._stride = 0.0
+        self._duty = duty
+
+    def set_gait(self, gait):
+        if gait not in GAITS:
+            raise ValueError(f"Unknown gait {gait!r}, expected one of {tuple(GAITS)}")
+        offsets = np.array(GAITS[gait])
+        if hasattr(self, 'phase'):
+            change = (offsets - self.offsets + 0.5) % 1.0 - 0.5
+            self.phase = (self.phase + SWITCH_NUDGE * change) % 1.0
+        self.gait = gait
+        self.offsets = offsets
+
+    def step(self, dt):
+        """Advance dt seconds; return (4, 2) leg angles, (inner, outer) per leg in LEGS order"""
+        # Every oscillator is pulled towards its offset from each of the others
+        wanted = self.offsets[None, :] - self.offsets[:, None]
+        error = self.phase[None, :] - self.phase[:, None] - wanted
+        pull = np.sin(2 * math.pi * error).mean(axis=1) * self.coupling / (2 * math.pi)
+        self.phase = (self.phase + (self.frequency + pull) * dt) % 1.0
+
+        alpha = 1 - math.exp(-dt / self.smoothing) if self.smoothing else 1.0
+        self._stride += alpha * (self.stride - self._stride)
+        self._duty += alpha * (self.duty - self._duty)
+        return self.angles()
+
+    def angles(self):
+        """(4, 2) leg angles for the current phases"""
+        return leg_angles(self.phase, self._stride, self._duty)
+
+    def settled(self, tolerance=0.02):
+        """True once the stride has glided to (nearly) zero, i.e. the legs have stopped"""
+        return self.stride == 0 and abs(self._stride) < tolerance
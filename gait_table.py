@@ -0,0 +1,171 @@
+"""
+Gait compiler: turns a gait definition into a dense table of servo angles,
+one row per control tick and one column per leg servo, covering exactly
+one cycle so it loops. Tables are cached on disk as .npy files keyed by
+their parameters and opened memory-mapped, so starting a gait is a file
+lookup and playing it is indexing rows, with no per-tick math.
+
+Two kinds of definition compile:
+    a CPG pattern ('trot', 'pace', 'bound', 'walk') at a frequency, stride
+    and duty factor, sampled from its steady state;
+    keyframes, a list of (seconds, {leg: (inner, outer)}) poses like the six
+    phases the old QuadrupedController.walk() stepped through (CLASSIC_WALK),
+    with min-jerk moves between them.
+"""
+import hashlib
+import math
+import os
+
+import numpy as np
+
+from gait import GAITS, LEGS, leg_angles
+from trajectory import Trajectory
+
+TABLE_VERSION = 1   # bump when compiled tables would come out differently
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'chopsticks1', 'gaits')
+
+# Column order: inner and outer servo of each leg in LEGS order. Inner
+# servos are mounted reversed, so their columns hold the negated leg angle.
+SERVO_SIGNS = np.array((-1, 1) * len(LEGS), dtype=np.float32)
+
+# The old walk(): diagonal pairs lift (15, 5), push (-15, -25) and trail at
+# 70% of the push, a quarter second per move at speed 1, with half a move's
+# pause after each trailing step
+_LIFT, _PUSH, _TRAIL = (15, 5), (-15, -25), (-15 * 0.7, -25 * 0.7)
+CLASSIC_WALK = [
+    (0.25, {'front_right': _LIFT, 'back_left': _LIFT}),
+    (0.25, {'front_right': _PUSH, 'back_left': _PUSH}),
+    (0.375, {'front_left': _TRAIL, 'back_right': _TRAIL}),
+    (0.25, {'front_left': _LIFT, 'back_right': _LIFT}),
+    (0.25, {'front_left': _PUSH, 'back_right': _PUSH}),
+    (0.375, {'front_right': _TRAIL, 'back_left': _TRAIL}),
+]
+
+
+def compile_cpg(gait, frequency, stride=1.0, duty=0.6, rate=50):
+    """Table of one steady-state cycle of a CPG pattern at `rate` ticks per second"""
+    ticks = max(1, round(rate / frequency))
+    phase = np.array(GAITS[gait]) + (np.arange(ticks) / ticks)[:, None]
+    angles = leg_angles(phase, stride, duty).reshape(ticks, -1)
+    return (angles * SERVO_SIGNS).astype(np.float32)
+
+
+def compile_keyframes(keyframes, rate=50, speed=1.0):
+    """
+    Table of one cycle of keyframes. Each keyframe moves the legs it names
+    to their (inner, outer) angles over its seconds / speed; the others hold.
+    The cycle starts from the pose it ends in, so the table loops seamlessly.
+    """
+    # Run the cycle once from neutral to find the pose it settles into
+    pose = np.zeros((len(LEGS), 2))
+    for _, legs in keyframes:
+        for name, angles in legs.items():
+            pose[LEGS.index(name)] = angles
+
+    rows = []
+    for seconds, legs in keyframes:
+        end = pose.copy()
+        for name, angles in legs.items():
+            end[LEGS.index(name)] = angles
+        ticks = max(1, round(seconds / speed * rate))
+        trajectory = Trajectory(pose.ravel(), end.ravel(), math.inf, duration=ticks / rate)
+        rows.append(trajectory.sample(rate)[:ticks])
+        pose = end
+    return (np.concatenate(rows) * SERVO_SIGNS).astype(np.float32)
+
+
+class GaitCache:
+    """
+    Compiled tables on disk, one .npy per parameter set, opened memory-mapped.
+    A table is compiled the first time its key is asked for and read back
+    every time after, across runs.
+    """
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self._open = {}
+        self.compiled = 0
+
+    def path(self, key):
+        digest = hashlib.sha1(repr((TABLE_VERSION, key)).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{key[0]}-{digest}.npy')
+
+    def get(self, key, compile):
+        """Table for key (a tuple of plain values), compiling it with compile() if it is not on disk"""
+        if key in self._open:
+            return self._open[key]
+        path = self.path(key)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename, so a half-written table is never picked up
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(compile(), dtype=np.float32))
+            os.replace(tmp, path)
+            self.compiled += 1
+        table = self._open[key] = np.load(path, mmap_mode='r')
+        return table
+
+    def clear(self):
+        """Forget open tables and delete every cached file"""
+        self._open.clear()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(self.directory, name))
+
+
+cache = GaitCache()
+
+
+def gait_table(gait, frequency, stride=1.0, duty=0.6, rate=50, cache=None):
+    """
+    Cached table for a CPG pattern, or for 'classic', the old walk()'s
+    keyframes (which only take the frequency; stride and duty are fixed).
+    Without a cache, the module's cache at the time of the call is used.
+    """
+    if cache is None:
+        cache = globals()['cache']
+    frequency = round(frequency, 4)
+    if gait == 'classic':
+        speed = frequency * sum(seconds for seconds, _ in CLASSIC_WALK)
+        return cache.get(('classic', rate, frequency),
+                         lambda: compile_keyframes(CLASSIC_WALK, rate, speed))
+    if gait not in GAITS:
+        raise ValueError(f"Unknown gait {gait!r}, expected 'classic' or one of {tuple(GAITS)}")
+    stride, duty = round(stride, 4), round(duty, 4)
+    return cache.get((gait, rate, frequency, stride, duty),
+                     lambda: compile_cpg(gait, frequency, stride, duty, rate))
+
+
+class TablePlayer:
+    """
+    Loops a compiled table one row per control tick. switch() changes table
+    at the same point of the cycle; stop() ends playback at the end of the
+    current cycle.
+    """
+    def __init__(self, table):
+        self.index = 0
+        self.stopping = False
+        self._load(table)
+
+    def _load(self, table):
+        self.table = table
+        # One conversion up front; every tick after is a list index
+        self.rows = table.tolist()
+
+    def switch(self, table):
+        self.index = round(self.index / len(self.rows) * len(table)) % len(table)
+        self._load(table)
+        # A new gait cancels a stop that has not played out yet
+        self.stopping = False
+
+    def stop(self):
+        self.stopping = True
+
+    def next_row(self):
+        """Servo angles for this tick, or None once a stop has played out"""
+        if self.stopping and self.index == 0:
+            return None
+        row = self.rows[self.index]
+        self.index = (self.index + 1) % len(self.rows)
+        return row
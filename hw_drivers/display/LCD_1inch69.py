@@ -1,191 +1,451 @@
 
 import time
+import logging
 from . import lcdconfig
 
 class LCD_1inch69(lcdconfig.RaspberryPi):
     width = 240
     height = 280 
+    tile_size = 8           # dirty-tracking granularity in pixels
+    max_dirty_rects = 6     # above this a single bounding window is cheaper
+
+    # ST7789V2 datasheet minimums, in seconds
+    RESET_PULSE = 0.00001           # RESX low pulse
+    RESET_SETTLE = 0.005            # RESX high to first command
+    RESET_TO_SLEEP_OUT = 0.120      # RESX high to SLPOUT
+    SLEEP_OUT_SETTLE = 0.005        # SLPOUT to next command
+
+    # Hardware scrolling runs along frame memory rows, the panel's long axis:
+    # the 20 hidden rows above and below the glass are fixed, the 280 visible ones scroll
+    SCROLL_FIXED = 20
+
+    # Interface pixel formats as (COLMOD, bytes per pixel). rgb444 sends 25%
+    # fewer bytes than rgb565; rgb666 sends 50% more for full 18-bit colour from ShowImage
+    PIXEL_FORMATS = {
+        'rgb444': (0x03, 1.5),
+        'rgb565': (0x05, 2),
+        'rgb666': (0x06, 3),
+    }
+
+    # Power-on register sequence as (command, payload, delay after)
+    INIT_SEQUENCE = (
+        (0x36, b'\x00', 0),                        # MADCTL: portrait
+        (0x3A, b'\x05', 0),                        # COLMOD, replaced by pixel_format
+        (0xB2, b'\x0B\x0B\x00\x33\x35', 0),        # PORCTRL
+        (0xB7, b'\x11', 0),                        # GCTRL
+        (0xBB, b'\x35', 0),                        # VCOMS
+        (0xC0, b'\x2C', 0),                        # LCMCTRL
+        (0xC2, b'\x01', 0),                        # VDVVRHEN
+        (0xC3, b'\x0D', 0),                        # VRHS
+        (0xC4, b'\x20', 0),                        # VDVS, 0x20: 0V
+        (0xC6, b'\x13', 0),                        # FRCTRL2, 0x13: 60Hz
+        (0xD0, b'\xA4\xA1', 0),                    # PWCTRL1
+        (0xD6, b'\xA1', 0),
+        (0xE0, bytes((0xF0, 0x06, 0x0B, 0x0A, 0x09, 0x26, 0x29,
+                      0x33, 0x41, 0x18, 0x16, 0x15, 0x29, 0x2D)), 0),  # PVGAMCTRL
+        (0xE1, bytes((0xF0, 0x04, 0x08, 0x08, 0x07, 0x03, 0x28,
+                      0x32, 0x40, 0x3B, 0x19, 0x18, 0x2A, 0x2E)), 0),  # NVGAMCTRL
+        (0xE4, b'\x25\x00\x00', 0),                # GATECTRL
+        (0x21, b'', 0),                            # INVON
+        (0x11, b'', SLEEP_OUT_SETTLE),             # SLPOUT
+        (0x29, b'', 0),                            # DISPON
+    )
+
+    def __init__(self, *args, pixel_format='rgb565', **kwargs):
+        super().__init__(*args, **kwargs)
+        if pixel_format not in self.PIXEL_FORMATS:
+            raise ValueError(f"Unknown pixel format {pixel_format!r}")
+        self.pixel_format = pixel_format    # may be changed between frames
+        self._frames = {}
+        self._shadow = None     # copy of what the panel currently shows
+        self._diff = None
+        self.partial_refresh = True
+        self.dirty_rects = []
+        self._regs = {}         # last payload written to each cacheable register
+        self._dc = None         # last level driven on DC_PIN
+        self.frame_bytes = 0    # bytes on the wire for the last ShowImage
+        self.frame_transfers = 0    # SPI transactions for the last ShowImage
+        self.timings = {}       # bring-up durations in seconds, see timing_hook
+        self.timing_hook = None # optional callable(name, seconds)
+        self._init_started = None
+        self._reset_at = 0.0
+        self.scroll_offset = 0  # hardware scroll position, see Scroll
     
+    def _set_dc(self, level):
+        """Drive DC only when its level actually changes"""
+        if self._dc != level:
+            self.digital_write(self.DC_PIN, level)
+            self._dc = level
+
     def command(self, cmd):
-        self.digital_write(self.DC_PIN, False)
+        self._regs.pop(cmd, None)   # payload follows through data(), cache is stale
+        self._set_dc(False)
         self.spi_writebyte([cmd])   
         
     def data(self, val):
-        self.digital_write(self.DC_PIN, True)
+        self._set_dc(True)
         self.spi_writebyte([val])   
+
+    def _write_command(self, cmd, payload=b''):
+        """Send a command byte and its whole payload as one SPI transaction"""
+        self._set_dc(False)
+        self.spi_writebyte([cmd])
+        if payload:
+            self._set_dc(True)
+            self.spi_writebuffer(payload)
+
+    def _write_register(self, cmd, payload):
+        """Send a register write unless the panel already holds that value"""
+        if self._regs.get(cmd) != payload:
+            self._write_command(cmd, payload)
+            self._regs[cmd] = payload
         
     def reset(self):
         """Reset the display"""
-        self.digital_write(self.RST_PIN,True)
-        time.sleep(0.01)
         self.digital_write(self.RST_PIN,False)
-        time.sleep(0.01)
+        time.sleep(self.RESET_PULSE)
         self.digital_write(self.RST_PIN,True)
-        time.sleep(0.01)
+        self.reset_done(time.monotonic())
+        time.sleep(self.RESET_SETTLE)
+
+    def reset_done(self, released_at):
+        """Forget cached panel state after a reset released at released_at (time.monotonic)"""
+        self._regs = {}
+        self._dc = None
+        self._shadow = None
+        self._reset_at = released_at
+        self.scroll_offset = 0
+
+    def _report_timing(self, name, seconds):
+        self.timings[name] = seconds
+        logging.debug("LCD %s took %.1f ms", name, seconds * 1000)
+        if self.timing_hook is not None:
+            self.timing_hook(name, seconds)
         
     def Init(self):
         """Initialize dispaly"""  
+        started = time.monotonic()
+        self._init_started = started
         self.module_init()
         self.reset()
+        self._report_timing('reset', time.monotonic() - started)
+        self.init_registers()
+        self._report_timing('init', time.monotonic() - started)
 
-        self.command(0x36)
-        self.data(0x00)
-
-        self.command(0x3A) 
-        self.data(0x05)
-
-        self.command(0xB2)
-        self.data(0x0B)
-        self.data(0x0B)
-        self.data(0x00)
-        self.data(0x33)
-        self.data(0x35)
-
-        self.command(0xB7)
-        self.data(0x11) 
-
-        self.command(0xBB)
-        self.data(0x35)
-
-        self.command(0xC0)
-        self.data(0x2C)
-
-        self.command(0xC2)
-        self.data(0x01)
-
-        self.command(0xC3)
-        self.data(0x0D)   
-
-        self.command(0xC4)
-        self.data(0x20) # VDV, 0x20: 0V
-
-        self.command(0xC6)
-        self.data(0x13) # 0x13: 60Hz 
-
-        self.command(0xD0)
-        self.data(0xA4)
-        self.data(0xA1)
-
-        self.command(0xD6)
-        self.data(0xA1)
-
-        self.command(0xE0)
-        self.data(0xF0)
-        self.data(0x06)
-        self.data(0x0B)
-        self.data(0x0A)
-        self.data(0x09)
-        self.data(0x26)
-        self.data(0x29)
-        self.data(0x33)
-        self.data(0x41)
-        self.data(0x18)
-        self.data(0x16)
-        self.data(0x15)
-        self.data(0x29)
-        self.data(0x2D)
-
-        self.command(0xE1)
-        self.data(0xF0)
-        self.data(0x04)
-        self.data(0x08)
-        self.data(0x08)
-        self.data(0x07)
-        self.data(0x03)
-        self.data(0x28)
-        self.data(0x32)
-        self.data(0x40)
-        self.data(0x3B)
-        self.data(0x19)
-        self.data(0x18)
-        self.data(0x2A)
-        self.data(0x2E)
-        
-        self.command(0xE4)
-        self.data(0x25)
-        self.data(0x00)
-        self.data(0x00)
+    def init_registers(self):
+        """Send INIT_SEQUENCE; the panel must have been reset first"""
+        for cmd, payload, delay in self.INIT_SEQUENCE:
+            if cmd == 0x11:
+                # Sleep out is refused until 120 ms after reset is released
+                wait = self._reset_at + self.RESET_TO_SLEEP_OUT - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            if cmd == 0x3A:
+                self._set_pixel_format()
+            elif cmd == 0x36:
+                self._write_register(cmd, payload)
+            else:
+                self._write_command(cmd, payload)
+            if delay:
+                time.sleep(delay)
+  
+    def SetWindows(self, Xstart, Ystart, Xend, Yend, horizontal = 0):
+        if horizontal:  
+            Xstart, Xend = Xstart+20, Xend+20   #Landscape RAM starts 20 columns in
+        else:
+            Ystart, Yend = Ystart+20, Yend+20   #Portrait RAM starts 20 rows in
+        #set the X coordinates (start and end, high octet first)
+        self._write_register(0x2A, bytes((Xstart>>8, Xstart & 0xff, Xend-1>>8, (Xend-1) & 0xff)))
+        #set the Y coordinates
+        self._write_register(0x2B, bytes((Ystart>>8, Ystart & 0xff, Yend-1>>8, (Yend-1) & 0xff)))
+        self._write_command(0x2C)
 
-        self.command(0x21)
 
-        self.command(0x11)
+    def _frame_buffers(self, rows, cols):
+        """Return the reusable RGB565 frame and scratch arrays for a frame shape"""
+        key = (rows, cols)
+        if key not in self._frames:
+            self._frames[key] = (
+                self.np.empty((rows, cols), dtype='>u2'),       # display-endian frame
+                self.np.empty((rows, cols), dtype=self.np.uint16),
+                self.np.empty((rows, cols), dtype=self.np.uint16),
+            )
+        return self._frames[key]
 
-        time.sleep(0.1)
+    def _pack_rgb565(self, img):
+        """Pack an RGB888 array into the preallocated big-endian RGB565 frame"""
+        frame, acc, tmp = self._frame_buffers(img.shape[0], img.shape[1])
+        self.np.copyto(acc, img[..., 0])
+        acc &= 0xF8
+        acc <<= 8
+        self.np.copyto(tmp, img[..., 1])
+        tmp &= 0xFC
+        tmp <<= 3
+        acc |= tmp
+        self.np.copyto(tmp, img[..., 2])
+        tmp >>= 3
+        acc |= tmp
+        frame[...] = acc    # byteswaps into display order, no allocation
+        return frame
 
-        self.command(0x29)
-  
-    def SetWindows(self, Xstart, Ystart, Xend, Yend, horizontal = 0):
-        if horizontal:  
-            #set the X coordinates
-            self.command(0x2A)
-            self.data(Xstart+20>>8)         #Set the horizontal starting point to the high octet
-            self.data(Xstart+20 & 0xff)     #Set the horizontal starting point to the low octet
-            self.data(Xend+20-1>>8)         #Set the horizontal end to the high octet
-            self.data((Xend+20-1) & 0xff)   #Set the horizontal end to the low octet 
-            #set the Y coordinates
-            self.command(0x2B)
-            self.data(Ystart>>8)
-            self.data((Ystart & 0xff))
-            self.data(Yend-1>>8)
-            self.data((Yend-1) & 0xff)
-            self.command(0x2C)
+    def _pack_rgb444(self, pixels):
+        """Pack RGB565 or RGB888 pixels to 12-bit RGB444, two pixels in three bytes"""
+        np = self.np
+        if pixels.ndim == 2:
+            v = pixels.astype(np.uint16).reshape(-1)
+            p = ((v >> 4) & 0xF00) | ((v >> 3) & 0xF0) | ((v >> 1) & 0xF)
         else:
-            #set the X coordinates
-            self.command(0x2A)
-            self.data(Xstart>>8)        #Set the horizontal starting point to the high octet
-            self.data(Xstart & 0xff)    #Set the horizontal starting point to the low octet
-            self.data(Xend-1>>8)        #Set the horizontal end to the high octet
-            self.data((Xend-1) & 0xff)  #Set the horizontal end to the low octet 
-            #set the Y coordinates
-            self.command(0x2B)
-            self.data(Ystart+20>>8)
-            self.data((Ystart+20 & 0xff))
-            self.data(Yend+20-1>>8)
-            self.data((Yend+20-1) & 0xff)
-            self.command(0x2C)    
+            rgb = pixels.reshape(-1, 3).astype(np.uint16) >> 4
+            p = (rgb[:, 0] << 8) | (rgb[:, 1] << 4) | rgb[:, 2]
+        if len(p) % 2:
+            raise ValueError("RGB444 windows need an even number of pixels")
+        a, b = p[0::2], p[1::2]
+        out = np.empty((len(a), 3), dtype=np.uint8)
+        out[:, 0] = a >> 4
+        out[:, 1] = ((a & 0xF) << 4) | (b >> 8)
+        out[:, 2] = b & 0xFF
+        return out.reshape(-1)
+
+    def _pack_rgb666(self, pixels):
+        """Pack RGB565 or RGB888 pixels to 18-bit RGB666, one byte per channel"""
+        np = self.np
+        if pixels.ndim == 3:
+            return (pixels.reshape(-1, 3) & 0xFC).astype(np.uint8).reshape(-1)
+        v = pixels.astype(np.uint16).reshape(-1)
+        out = np.empty((len(v), 3), dtype=np.uint8)
+        r, b = v >> 11, v & 0x1F
+        out[:, 0] = ((r << 1) | (r >> 4)) << 2     # widen 5 bits to 6 like the panel does
+        out[:, 1] = (v >> 3) & 0xFC
+        out[:, 2] = ((b << 1) | (b >> 4)) << 2
+        return out.reshape(-1)
+
+    def _encode(self, pixels):
+        """Interface bytes of a frame window in the current pixel_format"""
+        fmt = self.pixel_format
+        if fmt == 'rgb444':
+            return self._pack_rgb444(pixels)
+        if fmt == 'rgb666':
+            return self._pack_rgb666(pixels)
+        if pixels.ndim == 3:
+            pixels = self._pack_rgb565(pixels)
+        return self.np.ascontiguousarray(pixels).reshape(-1).view(self.np.uint8)
+
+    def _set_pixel_format(self):
+        """Select pixel_format on the panel; a change invalidates the shadow"""
+        colmod = bytes((self.PIXEL_FORMATS[self.pixel_format][0],))
+        if self._regs.get(0x3A) != colmod:
+            self._shadow = None
+        self._write_register(0x3A, colmod)
+
+    def _send_frame(self, frame):
+        """Stream a frame window to display RAM as contiguous memoryview slices, yielding per transaction"""
+        data = self._encode(frame)
+        self._set_dc(True)
+        yield from self.spi_writebuffer_steps(data)
+
+    def _dirty_rects(self, frame, shadow):
+        """Diff frame against the last transmitted one, merging changed tiles into (x0, y0, x1, y1) windows"""
+        np = self.np
+        rows, cols = frame.shape
+        t = self.tile_size
+        if self._diff is None or self._diff.shape != frame.shape:
+            self._diff = np.empty(frame.shape, dtype=bool)
+        changed = np.not_equal(frame, shadow, out=self._diff)
+        trows, tcols = -(-rows // t), -(-cols // t)
+        if rows % t or cols % t:
+            changed = np.pad(changed, ((0, trows*t - rows), (0, tcols*t - cols)))
+        tiles = changed.reshape(trows, t, tcols, t).any(axis=(1, 3))
+
+        # Grow one rectangle per vertically connected run of changed tiles
+        rects = []
+        open_rects = []
+        for ty in np.flatnonzero(tiles.any(axis=1)):
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], tiles[ty].view(np.int8), [0]))))
+            next_open = []
+            for x0, x1 in zip(edges[::2], edges[1::2]):
+                for r in open_rects:
+                    if r[3] == ty and r[0] < x1 and x0 < r[2]:
+                        r[0], r[2], r[3] = min(r[0], x0), max(r[2], x1), ty + 1
+                        break
+                else:
+                    r = [x0, ty, x1, ty + 1]
+                    rects.append(r)
+                if not any(r is o for o in next_open):
+                    next_open.append(r)
+            open_rects = next_open
+
+        # Rectangles that grew into each other are merged
+        i = 0
+        while i < len(rects):
+            a = rects[i]
+            for j in range(i + 1, len(rects)):
+                b = rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    a[:] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del rects[j]
+                    i = -1
+                    break
+            i += 1
+
+        if len(rects) > self.max_dirty_rects:
+            rects = [[min(r[0] for r in rects), min(r[1] for r in rects),
+                      max(r[2] for r in rects), max(r[3] for r in rects)]]
+        return [(int(x0)*t, int(y0)*t, min(int(x1)*t, cols), min(int(y1)*t, rows))
+                for x0, y0, x1, y1 in rects]
 
+    def _damage_rects(self, rects, rows, cols):
+        """Clip caller-supplied (x0, y0, x1, y1) damage to the frame, evening out RGB444 windows"""
+        out = []
+        for x0, y0, x1, y1 in rects:
+            x0, y0, x1, y1 = max(int(x0), 0), max(int(y0), 0), min(int(x1), cols), min(int(y1), rows)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            if self.pixel_format == 'rgb444' and (x1 - x0) * (y1 - y0) % 2:
+                # RGB444 sends pixels in pairs; frame widths are even so one side can grow
+                if x1 < cols:
+                    x1 += 1
+                else:
+                    x0 -= 1
+            out.append((x0, y0, x1, y1))
+        return out
+
+    def _present(self, frame, horizontal, pixels=None, rects=None):
+        """
+        Send only the windows of frame that differ from what the panel already
+        shows. pixels, if given, is the same picture in RGB888 to send from instead.
+        rects, if given, are the damaged windows and replace the diff.
+        """
+        rows, cols = frame.shape
+        shadow = self._shadow
+        if not self.partial_refresh or shadow is None or shadow.shape != frame.shape:
+            rects = [(0, 0, cols, rows)]
+            self._shadow = shadow = self.np.empty_like(frame)
+        elif rects is not None:
+            rects = self._damage_rects(rects, rows, cols)
+        else:
+            rects = self._dirty_rects(frame, shadow)
+        for x0, y0, x1, y1 in rects:
+            self.SetWindows(x0, y0, x1, y1, horizontal)
+            yield
+            source = frame if pixels is None else pixels
+            yield from self._send_frame(source[y0:y1, x0:x1])
+            shadow[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+        self.dirty_rects = rects
 
     def ShowImage(self, Image):
         """Set buffer to value of Python Imaging Library image."""
         """Write display buffer to physical display"""
-        imwidth, imheight = Image.size
-        if imwidth == self.height and imheight ==  self.width:
-            print("Landscape screen")
-            img = self.np.asarray(Image)
-            pix = self.np.zeros((self.width, self.height,2), dtype = self.np.uint8)
-            #RGB888 >> RGB565
-            pix[...,[0]] = self.np.add(self.np.bitwise_and(img[...,[0]],0xF8),self.np.right_shift(img[...,[1]],5))
-            pix[...,[1]] = self.np.add(self.np.bitwise_and(self.np.left_shift(img[...,[1]],3),0xE0), self.np.right_shift(img[...,[2]],3))
-            pix = pix.flatten().tolist()
-            
-            self.command(0x36)
-            self.data(0x70)
-            self.SetWindows(0, 0, self.height,self.width, 1)
-            self.digital_write(self.DC_PIN,True)
-            for i in range(0,len(pix),4096):
-                self.spi_writebyte(pix[i:i+4096])
+        img = self.np.asarray(Image)
+        frame = self._pack_rgb565(img)
+        # RGB666 is sent from the image itself; the RGB565 frame is only diffed
+        self.ShowFrame(frame, img if self.pixel_format == 'rgb666' else None)
+
+    def ShowFrame(self, frame, pixels=None, rects=None):
+        """
+        Write a (rows, cols) RGB565 array, e.g. Canvas.buffer, to the display.
+        A caller that knows what changed (see face.scene) passes the damaged
+        (x0, y0, x1, y1) rects, and the frame is not diffed.
+        """
+        for _ in self.frame_steps(frame, pixels, rects):
+            pass
+
+    def frame_steps(self, frame, pixels=None, rects=None):
+        """
+        ShowFrame as a generator that yields between SPI transactions, so a
+        caller sharing the bus (see DualDisplay) can interleave other traffic
+        """
+        if frame.dtype != self.np.dtype('>u2'):
+            frame = frame.astype('>u2')
+        start, start_transfers = self.bytes_written, self.transfers
+        self._set_pixel_format()
+        if frame.shape == (self.width, self.height):
+            # Landscape screen
+            self._write_register(0x36, b'\x70')
+            yield from self._present(frame, 1, pixels, rects)
         else :
-            print("Portrait screen")
-            img = self.np.asarray(Image)
-            pix = self.np.zeros((imheight,imwidth , 2), dtype = self.np.uint8)
-            
-            pix[...,[0]] = self.np.add(self.np.bitwise_and(img[...,[0]],0xF8),self.np.right_shift(img[...,[1]],5))
-            pix[...,[1]] = self.np.add(self.np.bitwise_and(self.np.left_shift(img[...,[1]],3),0xE0), self.np.right_shift(img[...,[2]],3))
-            pix = pix.flatten().tolist()
-            
-            self.command(0x36)
-            self.data(0x00)
-            self.SetWindows(0, 0, self.width, self.height, 0)
-            self.digital_write(self.DC_PIN,True)
-        for i in range(0, len(pix), 4096):
-            self.spi_writebyte(pix[i: i+4096])
-        
+            # Portrait screen
+            self._write_register(0x36, b'\x00')
+            yield from self._present(frame, 0, pixels, rects)
+        self.frame_bytes = self.bytes_written - start
+        self.frame_transfers = self.transfers - start_transfers
+        if self._init_started is not None:
+            self._report_timing('first_frame', time.monotonic() - self._init_started)
+            self._init_started = None
+
+    def Scroll(self, offset):
+        """
+        Move the whole image offset pixels along the long axis (up in portrait,
+        left in landscape) with the panel's vertical scroll, wrapping around.
+        Only the scroll start address is sent, so a glance costs a few bytes
+        instead of a frame. Frame memory is not touched: later frames appear
+        shifted by the same offset until Scroll(0).
+        """
+        lines = self.height
+        fixed = self.SCROLL_FIXED
+        offset %= lines
+        # VSCRDEF: top fixed, scrolling and bottom fixed line counts
+        self._write_register(0x33, bytes((fixed >> 8, fixed & 0xff, lines >> 8, lines & 0xff,
+                                          fixed >> 8, fixed & 0xff)))
+        # VSCSAD: frame memory line shown first in the scrolling area
+        start = fixed + offset
+        self._write_register(0x37, bytes((start >> 8, start & 0xff)))
+        self.scroll_offset = offset
+
+    def slide_steps(self, frame, step=20, reverse=False):
+        """
+        Bring in frame by scrolling, yielding once per step: every step scrolls
+        the old image step pixels towards the start of the long axis (towards
+        the end with reverse) and writes only the strip of frame that scrolls
+        into view, so the whole transition sends one frame's worth of pixels.
+        The panel ends at its starting scroll offset showing frame.
+        """
+        np = self.np
+        if frame.dtype != np.dtype('>u2'):
+            frame = frame.astype('>u2')
+        self._set_pixel_format()
+        if frame.shape == (self.width, self.height):
+            self._write_register(0x36, b'\x70')
+            horizontal, axis = 1, 1
+        else:
+            self._write_register(0x36, b'\x00')
+            horizontal, axis = 0, 0
+        lines = self.height
+        base = self.scroll_offset
+        self._shadow = None
+        done = 0
+        while done < lines:
+            n = min(step, lines - done)
+            # Frame lines k land on memory line base + k, split where that wraps
+            first = lines - done - n if reverse else done
+            k = first
+            while k < first + n:
+                m = (base + k) % lines
+                end = min(first + n, k + lines - m)
+                if horizontal:
+                    self.SetWindows(m, 0, m + end - k, frame.shape[0], 1)
+                    strip = frame[:, k:end]
+                else:
+                    self.SetWindows(0, m, frame.shape[1], m + end - k, 0)
+                    strip = frame[k:end]
+                for _ in self._send_frame(strip):
+                    pass
+                k = end
+            done += n
+            self.Scroll(base - done if reverse else base + done)
+            yield
+        self._shadow = np.roll(frame, base, axis=axis)
+
+    def Slide(self, frame, step=20, reverse=False, fps=60):
+        """Scroll frame into view at fps steps per second, see slide_steps"""
+        for _ in self.slide_steps(frame, step, reverse):
+            time.sleep(1 / fps)
 
     def clear(self):
         """Clear contents of image buffer"""
-        _buffer = [0xff] * (self.width*self.height*2)
+        self._set_pixel_format()
+        self._shadow = None
+        _buffer = b'\xff' * int(self.width*self.height*self.PIXEL_FORMATS[self.pixel_format][1])
         self.SetWindows(0, 0, self.width, self.height)
-        self.digital_write(self.DC_PIN,True)
-        for i in range(0, len(_buffer), 4096):
-            self.spi_writebyte(_buffer[i: i+4096])
+        self._set_dc(True)
+        self.spi_writebuffer(_buffer)
         
@@ -0,0 +1,134 @@
+import time
+
+import numpy as np
+
+
+def color565(color):
+    """Convert an (r, g, b) tuple or colour name like "BLACK" to an RGB565 value"""
+    if isinstance(color, int):
+        return color
+    if isinstance(color, str):
+        from PIL import ImageColor
+        color = ImageColor.getrgb(color)
+    r, g, b = color[:3]
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+
+class Canvas:
+    """
+    Drawing surface backed by a reusable RGB565 framebuffer in display byte
+    order, so finished frames go to LCD_1inch69.ShowFrame without conversion.
+    Coordinates follow PIL: boxes are (x1, y1, x2, y2) with both ends included.
+    With pages > 1 drawing rotates through several buffers. in_use, e.g.
+    DisplayWriter.in_use, tells flip() which buffers the display still holds,
+    and flip() skips those, so a frame is never drawn over while it waits or
+    is on the wire even when the writer drops frames. A writer holds at most
+    two (one being sent, one waiting), so with 3 pages flip() only waits when
+    drawing has got a whole frame ahead of the panel, until the send finishes.
+    set_clip() limits all drawing to a rectangle, for redrawing damaged areas.
+    """
+    def __init__(self, width, height, pages=1, in_use=None):
+        self.width = width
+        self.height = height
+        self._pages = [np.zeros((height, width), dtype='>u2') for _ in range(pages)]
+        self._page = 0
+        self.buffer = self._pages[0]
+        self._cols = np.arange(width)
+        self.clip = None    # half-open (x0, y0, x1, y1) drawing is limited to
+        self.in_use = in_use
+
+    def flip(self):
+        """Return the finished frame and move drawing to the next page the display is not holding"""
+        frame = self.buffer
+        count = len(self._pages)
+        while True:
+            for step in range(1, count + 1):
+                page = (self._page + step) % count
+                # The finished frame is about to be handed over, so it is never the next page
+                if count == 1 or (page != self._page and not (self.in_use and self.in_use(self._pages[page]))):
+                    self._page = page
+                    self.buffer = self._pages[page]
+                    return frame
+            # Every other page is still with the display
+            time.sleep(0.001)
+
+    def set_clip(self, rect=None):
+        """Limit drawing to the half-open rect (x0, y0, x1, y1), or lift the limit with None"""
+        self.clip = rect
+
+    def _clip(self, x1, y1, x2, y2):
+        """Order and clip an inclusive box, returning half-open bounds"""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        bounds = (max(int(x1), 0), max(int(y1), 0),
+                  min(int(x2) + 1, self.width), min(int(y2) + 1, self.height))
+        if self.clip is not None:
+            cx0, cy0, cx1, cy1 = self.clip
+            bounds = (max(bounds[0], cx0), max(bounds[1], cy0), min(bounds[2], cx1), min(bounds[3], cy1))
+        return bounds
+
+    def fill(self, color):
+        """Fill the whole canvas, or the clip rectangle"""
+        if self.clip is None:
+            self.buffer.fill(color565(color))
+        else:
+            self.fill_rect((0, 0, self.width - 1, self.height - 1), color)
+
+    def fill_rect(self, coords, color):
+        """Fill an axis-aligned rectangle"""
+        x0, y0, x1, y1 = self._clip(*coords)
+        if x0 < x1 and y0 < y1:
+            self.buffer[y0:y1, x0:x1] = color565(color)
+
+    def rounded_rect(self, coords, radius, color):
+        """Fill a rectangle with rounded corners in one masked write"""
+        x1, y1, x2, y2 = coords
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+
+        # Ensure the corners fit
+        radius = min(radius, (x2 - x1) // 2, (y2 - y1) // 2)
+        if radius <= 0:
+            self.fill_rect((x1, y1, x2, y2), color)
+            return
+
+        x0c, y0c, x1c, y1c = self._clip(x1, y1, x2, y2)
+        if x0c >= x1c or y0c >= y1c:
+            return
+
+        # Horizontal inset of every row from the corner circles
+        rows = np.arange(y0c, y1c)
+        dy = np.maximum(np.maximum(y1 + radius - rows, rows - (y2 - radius)), 0)
+        inset = radius - np.sqrt(np.maximum(radius * radius - dy * dy, 0))
+        inset = np.rint(inset).astype(np.int32)
+
+        cols = self._cols[x0c:x1c]
+        mask = (cols >= (x1 + inset)[:, None]) & (cols <= (x2 - inset)[:, None])
+        np.putmask(self.buffer[y0c:y1c, x0c:x1c], mask, color565(color))
+
+    def blend(self, x, y, alpha, color):
+        """Blend color over the canvas with per-pixel opacity alpha (an (h, w) array in [0, 1]) at (x, y)"""
+        h, w = alpha.shape
+        x0, y0, x1, y1 = self._clip(x, y, x + w - 1, y + h - 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        region = self.buffer[y0:y1, x0:x1]
+        v = region.astype(np.uint32)
+        c = color565(color)
+        out = np.zeros(region.shape, dtype=np.uint32)
+        # Mix each channel at its own RGB565 precision
+        for shift, mask in ((11, 0x1F), (5, 0x3F), (0, 0x1F)):
+            old = (v >> shift) & mask
+            new = old + (((c >> shift) & mask) - old.astype(np.float32)) * a
+            out |= np.rint(new).astype(np.uint32) << shift
+        region[...] = out
+
+    def blit(self, src, x, y):
+        """Copy an RGB565 array or another Canvas with its top-left corner at (x, y)"""
+        if isinstance(src, Canvas):
+            src = src.buffer
+        h, w = src.shape
+        x0, y0, x1, y1 = self._clip(x, y, x + w - 1, y + h - 1)
+        if x0 < x1 and y0 < y1:
+            self.buffer[y0:y1, x0:x1] = src[y0 - y:y1 - y, x0 - x:x1 - x]
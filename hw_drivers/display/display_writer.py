@@ -0,0 +1,134 @@
+import logging
+import threading
+
+
+def _holds(frame, buffer):
+    if isinstance(frame, (tuple, list)):
+        return any(part is buffer for part in frame)
+    return frame is buffer
+
+
+class DisplayWriter:
+    """
+    Sends frames to an LCD on a background thread, so rendering frame N+1
+    overlaps the SPI transfer of frame N.
+    Frames go through a one-slot mailbox: submitting while a frame is still
+    waiting replaces it, so the panel always gets the newest frame and a slow
+    bus drops stale frames instead of queueing them. Damage rects of a dropped
+    frame are carried over to the frame that replaces it.
+    Scroll offsets get a slot of their own, also newest-wins, so a glance is
+    never dropped in favour of a frame.
+    in_use() tells a Canvas which of its buffers the writer still holds, so
+    they are not drawn over before they have been sent.
+    Once started, the writer thread is the only user of the display until stop().
+    """
+    def __init__(self, disp):
+        self.disp = disp
+        self.frames_submitted = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._scroll = None
+        self._busy = False
+        self._sending = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the writer thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="DisplayWriter", daemon=True)
+        self._thread.start()
+
+    def _post(self, show, frame, rects=None):
+        with self._cond:
+            if self._pending is not None:
+                self.frames_dropped += 1
+                dropped = self._pending[2]
+                rects = None if rects is None or dropped is None else list(dropped) + list(rects)
+            self._pending = (show, frame, rects)
+            self.frames_submitted += 1
+            self._cond.notify_all()
+
+    def in_use(self, buffer):
+        """True while buffer is waiting to be sent or being sent, alone or in a (left, right) pair"""
+        with self._cond:
+            return _holds(self._sending, buffer) or (self._pending is not None and _holds(self._pending[1], buffer))
+
+    def submit(self, image):
+        """Queue a PIL image for display, replacing any frame not yet sent"""
+        self._post(self.disp.ShowImage, image)
+
+    def submit_frame(self, frame, rects=None):
+        """Queue an RGB565 frame (e.g. from Canvas.flip) for display, with its damage rects if known"""
+        self._post(self.disp.ShowFrame, frame, rects)
+
+    def scroll(self, offset):
+        """Queue a hardware scroll (LCD_1inch69.Scroll), replacing any not yet sent"""
+        with self._cond:
+            self._scroll = offset
+            self._cond.notify_all()
+
+    def slide(self, frame, step=20, reverse=False, fps=60):
+        """Queue a scrolling transition to frame (LCD_1inch69.Slide)"""
+        self._post(lambda f: self.disp.Slide(f, step, reverse, fps), frame)
+
+    # Drop-ins for the display methods so drawing code can target the writer directly
+    ShowImage = submit
+    ShowFrame = submit_frame
+    Scroll = scroll
+    Slide = slide
+
+    def flush(self, timeout=None):
+        """Wait until every submitted frame has been sent or dropped"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._pending is None and self._scroll is None and not self._busy, timeout)
+
+    def stop(self):
+        """Send the last pending frame, then stop the writer thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        logging.debug("DisplayWriter: %d submitted, %d sent, %d dropped",
+                      self.frames_submitted, self.frames_sent, self.frames_dropped)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._scroll is not None
+                                    or not self._running)
+                if self._pending is None and self._scroll is None:
+                    return
+                pending, self._pending = self._pending, None
+                offset, self._scroll = self._scroll, None
+                self._busy = True
+                self._sending = pending[1] if pending is not None else None
+            sent = False
+            try:
+                if offset is not None:
+                    self.disp.Scroll(offset)
+                if pending is not None:
+                    show, frame, rects = pending
+                    if rects is None:
+                        show(frame)
+                    else:
+                        show(frame, rects=rects)
+                    sent = True
+            except Exception as e:
+                logging.error(f"Error sending frame: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._sending = None
+                    if sent:
+                        self.frames_sent += 1
+                    self._cond.notify_all()
@@ -0,0 +1,152 @@
+import threading
+import time
+
+from . import LCD_1inch69 as LCD
+from .lcdconfig import GpioZeroPins
+
+
+class SharedPins:
+    """
+    Pin backend that hands out one device per pin number, so two panels can
+    share their DC, RST or backlight lines.
+    """
+    def __init__(self, gpio=None):
+        self.gpio = gpio if gpio is not None else GpioZeroPins()
+        self._devices = {}
+
+    def _device(self, key, create):
+        if key not in self._devices:
+            self._devices[key] = create()
+        return self._devices[key]
+
+    def output(self, pin):
+        return self._device(('out', pin), lambda: self.gpio.output(pin))
+
+    def input(self, pin, pull_up=None, active_state=True):
+        return self._device(('in', pin), lambda: self.gpio.input(pin, pull_up=pull_up, active_state=active_state))
+
+    def pwm(self, pin, frequency):
+        return self._device(('pwm', pin), lambda: self.gpio.pwm(pin, frequency))
+
+
+class DualDisplay:
+    """
+    One LCD_1inch69 per eye on the same SPI bus (CE0 and CE1).
+    Both panels are driven from one place: frames are presented as a
+    (left, right) pair in a single step, with the two uploads interleaved
+    one SPI transaction at a time, so both eyes change together and the bus
+    carries no more than the two frames themselves.
+    ShowFrame/ShowImage/Slide take the pair, so a DisplayWriter in front of
+    a DualDisplay drops or sends both eyes together and they cannot drift apart.
+    """
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.panels = (left, right)
+        self.bus_lock = threading.Lock()
+        self.shared_dc = left._dc_pin == right._dc_pin
+        self.shared_reset = left._rst == right._rst
+        self.frames_presented = 0
+        self.frame_bytes = 0
+        self._active = None
+
+    @classmethod
+    def create(cls, bus=0, left_dc=25, right_dc=25, rst=27, bl=18, gpio=None, **kwargs):
+        """Build both panels on CE0/CE1 of one bus; pins given once are shared"""
+        pins = SharedPins(gpio)
+        left = LCD.LCD_1inch69(spi=(bus, 0), dc=left_dc, rst=rst, bl=bl, gpio=pins, **kwargs)
+        right = LCD.LCD_1inch69(spi=(bus, 1), dc=right_dc, rst=rst, bl=bl, gpio=pins, **kwargs)
+        return cls(left, right)
+
+    def Init(self):
+        """Bring both panels up; a shared reset line is pulsed only once"""
+        with self.bus_lock:
+            if not self.shared_reset:
+                self.left.Init()
+                self.right.Init()
+                return
+            started = time.monotonic()
+            for panel in self.panels:
+                # Each panel reports its first frame as Init() would
+                panel._init_started = started
+                panel.module_init()
+            self.left.reset()
+            self.right.reset_done(self.left._reset_at)
+            for panel in self.panels:
+                panel._report_timing('reset', time.monotonic() - started)
+            # The second panel's sleep-out wait is already covered by the first
+            self.left.init_registers()
+            self.right.init_registers()
+            for panel in self.panels:
+                panel._report_timing('init', time.monotonic() - started)
+            self._active = None
+
+    def clear(self):
+        with self.bus_lock:
+            for panel in self.panels:
+                self._switch_to(panel)
+                panel.clear()
+
+    def Scroll(self, offset):
+        """Hardware-scroll both eyes by the same offset"""
+        with self.bus_lock:
+            for panel in self.panels:
+                self._switch_to(panel)
+                panel.Scroll(offset)
+
+    def bl_DutyCycle(self, duty):
+        for panel in self.panels:
+            panel.bl_DutyCycle(duty)
+
+    def _switch_to(self, panel):
+        """Put a shared DC line back where this panel left it"""
+        if self.shared_dc and self._active is not panel and panel._dc is not None:
+            panel.digital_write(panel.DC_PIN, panel._dc)
+        self._active = panel
+
+    def _interleave(self, uploads):
+        """Step (panel, generator) uploads in turn, one SPI transaction each, until all are done"""
+        while uploads:
+            for upload in list(uploads):
+                panel, steps = upload
+                self._switch_to(panel)
+                if next(steps, StopIteration) is StopIteration:
+                    uploads.remove(upload)
+
+    def ShowFrame(self, frames, rects=None):
+        """
+        Present a (left, right) pair of RGB565 frames, interleaving their
+        transfers. rects, if given, are the damaged (x0, y0, x1, y1) windows
+        of both eyes together and are sent on each panel instead of a diff.
+        """
+        with self.bus_lock:
+            start = sum(panel.bytes_written for panel in self.panels)
+            self._interleave([(panel, panel.frame_steps(frame, rects=rects))
+                              for panel, frame in zip(self.panels, frames)])
+            self.frame_bytes = sum(panel.bytes_written for panel in self.panels) - start
+            self.frames_presented += 1
+
+    def Slide(self, frames, step=20, reverse=False, fps=60):
+        """Scroll a (left, right) pair into view on both eyes together, see LCD_1inch69.slide_steps"""
+        with self.bus_lock:
+            start = sum(panel.bytes_written for panel in self.panels)
+            slides = [panel.slide_steps(frame, step, reverse) for panel, frame in zip(self.panels, frames)]
+            while True:
+                # Both panels take the same number of steps
+                for panel, steps in zip(self.panels, slides):
+                    self._switch_to(panel)
+                    done = next(steps, StopIteration) is StopIteration
+                if done:
+                    break
+                time.sleep(1 / fps)
+            self.frame_bytes = sum(panel.bytes_written for panel in self.panels) - start
+            self.frames_presented += 1
+
+    def ShowImage(self, images):
+        """Present a (left, right) pair of PIL images"""
+        self.ShowFrame([panel._pack_rgb565(panel.np.asarray(image))
+                        for panel, image in zip(self.panels, images)])
+
+    def module_exit(self):
+        for panel in self.panels:
+            panel.module_exit()
@@ -0,0 +1,247 @@
+import numpy as np
+
+# ST7789 frame memory is 240 columns x 320 rows; the 1.69" glass shows rows 20-299
+RAM_COLS = 240
+RAM_ROWS = 320
+VISIBLE_ROWS = slice(20, 300)
+
+# Bytes per pixel group and pixels per group for each COLMOD interface format
+PIXEL_FORMATS = {
+    0x3: (3, 2),    # 12-bit RGB444, two pixels in three bytes
+    0x5: (2, 1),    # 16-bit RGB565
+    0x6: (3, 1),    # 18-bit RGB666, one byte per channel
+}
+
+# Parameter bytes of the registers the emulator decodes
+PARAM_LENGTHS = {0x2A: 4, 0x2B: 4, 0x33: 6, 0x36: 1, 0x37: 2, 0x3A: 1}
+
+
+class EmulatedPin:
+    """Stand-in for a gpiozero output or PWM device"""
+    def __init__(self, pin, on_change=None, frequency=None):
+        self.pin = pin
+        self.value = 0
+        self.frequency = frequency
+        self.closed = False
+        self._on_change = on_change
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def _set(self, value):
+        if value != self.value:
+            self.value = value
+            if self._on_change:
+                self._on_change(self)
+
+    def close(self):
+        self.closed = True
+
+
+def decode_pixels(data, colmod):
+    """Decode interface bytes in a COLMOD format to an (n, 3) RGB888 array"""
+    data = np.frombuffer(data, dtype=np.uint8)
+    fmt = colmod & 0x7
+    if fmt == 0x5:
+        v = data.view('>u2').astype(np.uint16)
+        r, g, b = (v >> 11) & 0x1F, (v >> 5) & 0x3F, v & 0x1F
+        return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=-1).astype(np.uint8)
+    if fmt == 0x6:
+        rgb = data.reshape(-1, 3) & 0xFC
+        return rgb | (rgb >> 6)
+    if fmt == 0x3:
+        b3 = data.reshape(-1, 3)
+        nibbles = np.stack((b3[:, 0] >> 4, b3[:, 0] & 0xF, b3[:, 1] >> 4,
+                            b3[:, 1] & 0xF, b3[:, 2] >> 4, b3[:, 2] & 0xF), axis=-1)
+        return (nibbles.reshape(-1, 3) * 0x11).astype(np.uint8)
+    raise ValueError(f"Unsupported COLMOD 0x{colmod:02X}")
+
+
+class ST7789Emulator:
+    """
+    SpiDev and pin backend that decodes the command stream LCD_1inch69 sends
+    (CASET/RASET/RAMWR/MADCTL/COLMOD/VSCRDEF/VSCSAD) into an in-memory frame memory, so the
+    display stack can be tested and profiled without the panel:
+
+        emu = ST7789Emulator(dc=DC, rst=RST)
+        disp = LCD_1inch69(spi=emu, gpio=emu, dc=DC, rst=RST)
+
+    Bytes, SPI transactions and DC toggles are counted, and transfer time
+    is modelled from max_speed_hz plus fixed per-transaction and per-GPIO
+    costs. mark_frame() closes the current frame's statistics.
+    """
+    def __init__(self, dc=25, rst=27, transaction_overhead=20e-6, gpio_overhead=5e-6):
+        self.dc_pin = dc
+        self.rst_pin = rst
+        self.transaction_overhead = transaction_overhead
+        self.gpio_overhead = gpio_overhead
+
+        # SpiDev attributes set by the driver
+        self.max_speed_hz = 40000000
+        self.mode = 0
+        self.closed = False
+
+        self.gram = np.zeros((RAM_ROWS, RAM_COLS, 3), dtype=np.uint8)
+        self.frames = []
+        self.totals = self._empty_stats()
+        self._stats = self._empty_stats()
+        self._dc = 0
+        self.reset_state()
+
+    @staticmethod
+    def _empty_stats():
+        return {'bytes': 0, 'pixel_bytes': 0, 'transactions': 0, 'dc_toggles': 0, 'time': 0.0}
+
+    def reset_state(self):
+        """Register state after a hardware or software reset"""
+        self.registers = {}
+        self.madctl = 0x00
+        self.colmod = 0x66
+        self.columns = (0, RAM_COLS - 1)
+        self.rows = (0, RAM_ROWS - 1)
+        self.scroll_area = (0, RAM_ROWS, 0)     # top fixed, scrolling, bottom fixed lines
+        self.scroll_start = 0
+        self.sleeping = True
+        self.display_on = False
+        self.inverted = False
+        self._cmd = None
+        self._params = bytearray()
+        self._pixel_ptr = 0
+        self._pixel_rest = b''
+
+    # -- pin backend --
+
+    def output(self, pin):
+        return EmulatedPin(pin, self._pin_changed)
+
+    def input(self, pin, pull_up=None, active_state=True):
+        return EmulatedPin(pin)
+
+    def pwm(self, pin, frequency):
+        return EmulatedPin(pin, frequency=frequency)
+
+    def _pin_changed(self, pin):
+        if pin.pin == self.dc_pin:
+            self._dc = pin.value
+            self._count(dc_toggles=1, time=self.gpio_overhead)
+        elif pin.pin == self.rst_pin and not pin.value:
+            self.reset_state()
+
+    # -- SpiDev API --
+
+    def writebytes(self, data):
+        self._transfer(bytes(data))
+
+    def writebytes2(self, data):
+        self._transfer(data)
+
+    def close(self):
+        self.closed = True
+
+    # -- statistics --
+
+    def _count(self, **values):
+        for key, value in values.items():
+            self._stats[key] += value
+            self.totals[key] += value
+
+    def mark_frame(self):
+        """Close the statistics of the current frame and return them"""
+        stats, self._stats = self._stats, self._empty_stats()
+        self.frames.append(stats)
+        return stats
+
+    # -- command decoding --
+
+    def _transfer(self, data):
+        data = memoryview(data).cast('B')
+        n = len(data)
+        self._count(bytes=n, transactions=1,
+                    time=n * 8 / self.max_speed_hz + self.transaction_overhead)
+        if not self._dc:
+            for cmd in data:
+                self._command(cmd)
+        elif self._cmd == 0x2C:
+            self._count(pixel_bytes=n)
+            self._write_pixels(data)
+        elif self._cmd is not None:
+            self._params += data
+            self.registers[self._cmd] = bytes(self._params)
+            if len(self._params) == PARAM_LENGTHS.get(self._cmd):
+                self._apply(self._cmd, self._params)
+
+    def _command(self, cmd):
+        self._cmd = cmd
+        self._params = bytearray()
+        if cmd == 0x01:
+            self.reset_state()
+        elif cmd == 0x10:
+            self.sleeping = True
+        elif cmd == 0x11:
+            self.sleeping = False
+        elif cmd in (0x20, 0x21):
+            self.inverted = cmd == 0x21
+        elif cmd in (0x28, 0x29):
+            self.display_on = cmd == 0x29
+        elif cmd == 0x2C:
+            self._pixel_ptr = 0
+            self._pixel_rest = b''
+
+    def _apply(self, cmd, p):
+        if cmd == 0x2A:
+            self.columns = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif cmd == 0x2B:
+            self.rows = (p[0] << 8 | p[1], p[2] << 8 | p[3])
+        elif cmd == 0x33:
+            self.scroll_area = (p[0] << 8 | p[1], p[2] << 8 | p[3], p[4] << 8 | p[5])
+        elif cmd == 0x36:
+            self.madctl = p[0]
+        elif cmd == 0x37:
+            self.scroll_start = p[0] << 8 | p[1]
+        elif cmd == 0x3A:
+            self.colmod = p[0]
+
+    def _write_pixels(self, data):
+        group, per_group = PIXEL_FORMATS[self.colmod & 0x7]
+        data = self._pixel_rest + bytes(data)
+        usable = len(data) - len(data) % group
+        self._pixel_rest = data[usable:]
+        if not usable:
+            return
+        rgb = decode_pixels(data[:usable], self.colmod)
+        if self.madctl & 0x08:
+            rgb = rgb[:, ::-1]      # BGR panel order
+
+        xs, xe = self.columns
+        ys, ye = self.rows
+        w, h = xe - xs + 1, ye - ys + 1
+        if w <= 0 or h <= 0:
+            return
+        idx = (self._pixel_ptr + np.arange(len(rgb))) % (w * h)
+        self._pixel_ptr = (self._pixel_ptr + len(rgb)) % (w * h)
+        x, y = xs + idx % w, ys + idx // w
+
+        # Row/column exchange first, then mirroring in frame memory
+        row, col = (x, y) if self.madctl & 0x20 else (y, x)
+        if self.madctl & 0x40:
+            col = RAM_COLS - 1 - col
+        if self.madctl & 0x80:
+            row = RAM_ROWS - 1 - row
+        ok = (row >= 0) & (row < RAM_ROWS) & (col >= 0) & (col < RAM_COLS)
+        self.gram[row[ok], col[ok]] = rgb[ok]
+
+    # -- inspection --
+
+    def screen(self, landscape=False):
+        """Return what the glass shows as an RGB888 array, rotated to match landscape frames"""
+        # Each scan line of the scrolling area shows a frame memory line offset by the scroll start
+        top, lines, _ = self.scroll_area
+        scan = np.arange(RAM_ROWS)
+        scrolled = (scan >= top) & (scan < top + lines)
+        if lines:
+            scan[scrolled] = top + (scan[scrolled] - top + self.scroll_start - top) % lines
+        view = self.gram[scan][VISIBLE_ROWS]
+        return np.rot90(view) if landscape else view
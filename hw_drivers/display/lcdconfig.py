@@ -30,36 +30,103 @@
 import os
 import sys
 import time
-import spidev
 import logging
 import numpy as np
-from gpiozero import *
+
+SPIDEV_BUFSIZ = '/sys/module/spidev/parameters/bufsiz'
+DEFAULT_TRANSFER = 4096     # spidev's bufsiz unless raised on the kernel command line
+
+def spidev_bufsiz(path=SPIDEV_BUFSIZ):
+    """Return the largest single spidev transfer the kernel accepts"""
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return DEFAULT_TRANSFER
+
+class GpioZeroPins:
+    """Pin backend for the real board, built on gpiozero (imported on first use)"""
+    def output(self, pin):
+        from gpiozero import DigitalOutputDevice
+        return DigitalOutputDevice(pin,active_high = True,initial_value =False)
+
+    def input(self, pin, pull_up=None, active_state=True):
+        from gpiozero import DigitalInputDevice
+        return DigitalInputDevice(pin,pull_up=pull_up,active_state=active_state)
+
+    def pwm(self, pin, frequency):
+        from gpiozero import PWMOutputDevice
+        return PWMOutputDevice(pin,frequency = frequency)
 
 class RaspberryPi:
-    def __init__(self,spi=spidev.SpiDev(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000):
+    """
+    Hardware interface for the panel.
+    spi is a (bus, device) pair to open, any object with the SpiDev write
+    API, or None for no bus; gpio is a pin backend like GpioZeroPins.
+    Passing an emulator for both runs the driver without hardware.
+    Nothing is opened until first use: the SPI device and each pin are
+    created when a method first touches them (normally in Init()).
+    """
+    def __init__(self,spi=(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000,max_transfer=None,gpio=None):
         self.np=np
+        self.GPIO = gpio if gpio is not None else GpioZeroPins()
         self.INPUT = False
         self.OUTPUT = True
 
         self.SPEED  =spi_freq
+        self.bytes_written = 0      # running count of bytes sent over SPI
+        self.transfers = 0          # running count of SPI transactions
+        self.max_transfer = max_transfer or spidev_bufsiz()
         self.BL_freq=bl_freq
 
-        self.RST_PIN= self.gpio_mode(rst,self.OUTPUT)
-        self.DC_PIN = self.gpio_mode(dc,self.OUTPUT)
-        self.BL_PIN = self.gpio_pwm(bl)
-        self.bl_DutyCycle(0)
+        self._rst, self._dc_pin, self._bl = rst, dc, bl
+        self._rst_dev = self._dc_dev = self._bl_dev = None
         
-        #Initialize SPI
-        self.SPI = spi
-        if self.SPI!=None :
-            self.SPI.max_speed_hz = spi_freq
-            self.SPI.mode = 0b00
+        #SPI is a (bus, device) pair until first use
+        self._spi = spi
+        if spi is not None and not isinstance(spi, tuple):
+            self._configure_spi(spi)
+
+    def _configure_spi(self, spi):
+        spi.max_speed_hz = self.SPEED
+        spi.mode = 0b00
+
+    @property
+    def SPI(self):
+        if isinstance(self._spi, tuple):
+            import spidev
+            spi = spidev.SpiDev(*self._spi)
+            self._configure_spi(spi)
+            self._spi = spi
+        return self._spi
+
+    @SPI.setter
+    def SPI(self, spi):
+        self._spi = spi
+
+    @property
+    def RST_PIN(self):
+        if self._rst_dev is None:
+            self._rst_dev = self.gpio_mode(self._rst,self.OUTPUT)
+        return self._rst_dev
+
+    @property
+    def DC_PIN(self):
+        if self._dc_dev is None:
+            self._dc_dev = self.gpio_mode(self._dc_pin,self.OUTPUT)
+        return self._dc_dev
+
+    @property
+    def BL_PIN(self):
+        if self._bl_dev is None:
+            self._bl_dev = self.gpio_pwm(self._bl)   # starts with the backlight off
+        return self._bl_dev
 
     def gpio_mode(self,Pin,Mode,pull_up = None,active_state = True):
         if Mode:
-            return DigitalOutputDevice(Pin,active_high = True,initial_value =False)
+            return self.GPIO.output(Pin)
         else:
-            return DigitalInputDevice(Pin,pull_up=pull_up,active_state=active_state)
+            return self.GPIO.input(Pin,pull_up=pull_up,active_state=active_state)
 
     def digital_write(self, Pin, value):
         if value:
@@ -74,11 +141,30 @@ class RaspberryPi:
         time.sleep(delaytime / 1000.0)
 
     def gpio_pwm(self,Pin):
-        return PWMOutputDevice(Pin,frequency = self.BL_freq)
+        return self.GPIO.pwm(Pin,self.BL_freq)
 
     def spi_writebyte(self, data):
         if self.SPI!=None :
             self.SPI.writebytes(data)
+            self.bytes_written += len(data)
+            self.transfers += 1
+
+    def spi_writebuffer(self, data):
+        """Write a byte buffer (bytes, memoryview) in as few max_transfer sized transactions as possible"""
+        for _ in self.spi_writebuffer_steps(data):
+            pass
+
+    def spi_writebuffer_steps(self, data):
+        """spi_writebuffer as a generator that yields after each transaction"""
+        if self.SPI!=None :
+            buf = memoryview(data)
+            step = self.max_transfer
+            for i in range(0, len(buf), step):
+                chunk = buf[i: i+step]
+                self.SPI.writebytes2(chunk)
+                self.transfers += 1
+                self.bytes_written += len(chunk)
+                yield
 
     def bl_DutyCycle(self, duty):
         self.BL_PIN.value = duty / 100
@@ -93,14 +179,18 @@ class RaspberryPi:
         return 0
 
     def module_exit(self):
+        # Only release what was actually opened
         logging.debug("spi end")
-        if self.SPI!=None :
-            self.SPI.close()
+        if self._spi is not None and not isinstance(self._spi, tuple):
+            self._spi.close()
         
         logging.debug("gpio cleanup...")
-        self.digital_write(self.RST_PIN, 1)
-        self.digital_write(self.DC_PIN, 0)   
-        self.BL_PIN.close()
+        if self._rst_dev is not None:
+            self.digital_write(self._rst_dev, 1)
+        if self._dc_dev is not None:
+            self.digital_write(self._dc_dev, 0)   
+        if self._bl_dev is not None:
+            self._bl_dev.close()
         time.sleep(0.001)
 
 
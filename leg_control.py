@@ -1,78 +1,107 @@
 from robot_hat import Servo
 import time
 
+import motion
+from gait import CPG, CYCLES_PER_SPEED
+import gait_table
+
 FRONT_RIGHT_LEG_PINS = (5, 7)
 FRONT_LEFT_LEG_PINS = (4, 6)
 BACK_RIGHT_LEG_PINS = (8,10)
 BACK_LEFT_LEG_PINS = (9,11)
 
+# Joint limits of the leg servos, about what a hobby servo manages under load
+LEG_SPEED = 600     # degrees per second
+LEG_ACCEL = 10000   # degrees per second squared
+
 class TheoJansenLeg:
-    def __init__(self, inner_pin, outer_pin):
+    def __init__(self, inner_pin, outer_pin, scheduler=None):
         self.inner_servo = Servo(f"P{inner_pin}")
         self.outer_servo = Servo(f"P{outer_pin}")
-        self.delay = 0.0
-        self.current_inner = 0
-        self.current_outer = 0
+        self.scheduler = scheduler or motion.scheduler
+        self.speed = LEG_SPEED
+        self.accel = LEG_ACCEL
+        for servo in (self.inner_servo, self.outer_servo):
+            self.scheduler.set_limits(servo, self.speed, self.accel)
         self.reset_position()
         
-    def _move_servo_smooth(self, servo, start_angle, end_angle, step=1):
-        direction = 1 if end_angle > start_angle else -1
-        for angle in range(int(start_angle), int(end_angle), direction * step):
-            servo.angle(angle)
-            time.sleep(self.delay)
+    @property
+    def current_inner(self):
+        return self.scheduler.position(self.inner_servo)
+        
+    @property
+    def current_outer(self):
+        return self.scheduler.position(self.outer_servo)
+        
+    def targets(self, inner_angle, outer_angle):
+        """Servo angles for a leg pose, to move together with other servos"""
+        return {self.inner_servo: -inner_angle, self.outer_servo: outer_angle}
             
     def reset_position(self):
-        self._move_servo_smooth(self.inner_servo, self.current_inner, 0)
-        self._move_servo_smooth(self.outer_servo, self.current_outer, 0)
-        self.current_inner = 0
-        self.current_outer = 0
+        self.move_leg(0, 0)
         
     def move_leg(self, inner_angle, outer_angle):
-        actual_inner_angle = -inner_angle
-        self._move_servo_smooth(self.inner_servo, self.current_inner, actual_inner_angle)
-        time.sleep(0.01)
-        self._move_servo_smooth(self.outer_servo, self.current_outer, outer_angle)
-        self.current_inner = actual_inner_angle
-        self.current_outer = outer_angle
+        # Both servos move together
+        self.scheduler.move(self.targets(inner_angle, outer_angle), self.speed, self.accel)
 
 class QuadrupedController:
-    def __init__(self):
-        self.front_right = TheoJansenLeg(*FRONT_RIGHT_LEG_PINS)
-        self.front_left = TheoJansenLeg(*FRONT_LEFT_LEG_PINS)
-        self.back_right = TheoJansenLeg(*BACK_RIGHT_LEG_PINS)
-        self.back_left = TheoJansenLeg(*BACK_LEFT_LEG_PINS)
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or motion.scheduler
+        self.front_right = TheoJansenLeg(*FRONT_RIGHT_LEG_PINS, scheduler=self.scheduler)
+        self.front_left = TheoJansenLeg(*FRONT_LEFT_LEG_PINS, scheduler=self.scheduler)
+        self.back_right = TheoJansenLeg(*BACK_RIGHT_LEG_PINS, scheduler=self.scheduler)
+        self.back_left = TheoJansenLeg(*BACK_LEFT_LEG_PINS, scheduler=self.scheduler)
+        self.legs = (self.front_right, self.front_left, self.back_right, self.back_left)
+        self._leg_servos = [servo for leg in self.legs for servo in (leg.inner_servo, leg.outer_servo)]
+        self.gait = None
         self.raise_angle = 20
         self.lower_angle = -20
         
+    def move_legs(self, poses, extra=None, speed=None):
+        """
+        Move several legs at once: poses maps each leg to its (inner, outer)
+        angles, extra adds any other servo targets (neck, tail) to the same
+        move. Every servo keeps to its own limits unless speed overrides them.
+        """
+        targets = dict(extra or {})
+        for leg, (inner_angle, outer_angle) in poses.items():
+            targets.update(leg.targets(inner_angle, outer_angle))
+        self.scheduler.move(targets, speed)
+        
     def reset_all(self):
-        self.front_right.reset_position()
-        self.front_left.reset_position()
-        self.back_right.reset_position()
-        self.back_left.reset_position()
+        self.move_legs({leg: (0, 0) for leg in self.legs})
         
     def raise_front(self):
-        self.front_right.move_leg(self.raise_angle, self.raise_angle)
-        self.front_left.move_leg(self.raise_angle, self.raise_angle)
-        self.back_right.move_leg(self.lower_angle/2, self.lower_angle/2)
-        self.back_left.move_leg(self.lower_angle/2, self.lower_angle/2)
+        self.move_legs({
+            self.front_right: (self.raise_angle, self.raise_angle),
+            self.front_left: (self.raise_angle, self.raise_angle),
+            self.back_right: (self.lower_angle/2, self.lower_angle/2),
+            self.back_left: (self.lower_angle/2, self.lower_angle/2),
+        })
         
     def lower_front(self):
-        self.front_right.move_leg(self.lower_angle, self.lower_angle)
-        self.front_left.move_leg(self.lower_angle, self.lower_angle)
-        self.back_right.move_leg(self.raise_angle/2, self.raise_angle/2)
-        self.back_left.move_leg(self.raise_angle/2, self.raise_angle/2)
+        self.move_legs({
+            self.front_right: (self.lower_angle, self.lower_angle),
+            self.front_left: (self.lower_angle, self.lower_angle),
+            self.back_right: (self.raise_angle/2, self.raise_angle/2),
+            self.back_left: (self.raise_angle/2, self.raise_angle/2),
+        })
         
     def raise_back(self):
-        self.back_right.move_leg(self.raise_angle, self.raise_angle)
-        self.back_left.move_leg(self.raise_angle, self.raise_angle)
-        self.front_right.move_leg(self.lower_angle/2, self.lower_angle/2)
-        self.front_left.move_leg(self.lower_angle/2, self.lower_angle/2)
+        self.move_legs({
+            self.back_right: (self.raise_angle, self.raise_angle),
+            self.back_left: (self.raise_angle, self.raise_angle),
+            self.front_right: (self.lower_angle/2, self.lower_angle/2),
+            self.front_left: (self.lower_angle/2, self.lower_angle/2),
+        })
         
     def lower_back(self):
-        self.back_right.move_leg(self.lower_angle, self.lower_angle)
-        self.back_left.move_leg(self.lower_angle, self.lower_angle)
-        self.front_right.move_leg(self.raise_angle/2, self.raise_angle/2)
-        self.front_left.move_leg(self.raise_angle/2, self.raise_angle/2)
+        self.move_legs({
+            self.back_right: (self.lower_angle, self.lower_angle),
+            self.back_left: (self.lower_angle, self.lower_angle),
+            self.front_right: (self.raise_angle/2, self.raise_angle/2),
+            self.front_left: (self.raise_angle/2, self.raise_angle/2),
+        })
 
     def demo_leg(self, leg_name):
         leg = getattr(self, leg_name)
@@ -83,10 +112,7 @@ class QuadrupedController:
         leg.reset_position()
     
     def rise(self, angle):
-        self.front_right.move_leg(angle, angle)
-        self.front_left.move_leg(angle, angle)
-        self.back_right.move_leg(angle, angle)
-        self.back_left.move_leg(angle, angle)
+        self.move_legs({leg: (angle, angle) for leg in self.legs})
 
     def happy(self):
         """Express happiness by doing a little dance"""
@@ -105,12 +131,10 @@ class QuadrupedController:
     def sad(self):
         """Express sadness by lowering front and drooping"""
         # Lower front legs slowly
-        self.front_right.move_leg(-30, -30)
-        self.front_left.move_leg(-30, -30)
+        self.move_legs({self.front_right: (-30, -30), self.front_left: (-30, -30)})
         time.sleep(1)
         # Slight droop in back
-        self.back_right.move_leg(-10, -10)
-        self.back_left.move_leg(-10, -10)
+        self.move_legs({self.back_right: (-10, -10), self.back_left: (-10, -10)})
         time.sleep(2)
         self.reset_all()
 
@@ -128,12 +152,10 @@ class QuadrupedController:
     def sit(self):
         """Sit command - lower back end and keep front up"""
         # Lower back legs
-        self.back_right.move_leg(-40, -40)
-        self.back_left.move_leg(-40, -40)
+        self.move_legs({self.back_right: (-40, -40), self.back_left: (-40, -40)})
         time.sleep(0.5)
         # Slightly adjust front for balance
-        self.front_right.move_leg(10, 10)
-        self.front_left.move_leg(10, 10)
+        self.move_legs({self.front_right: (10, 10), self.front_left: (10, 10)})
         time.sleep(2)  # Hold the sit position
 
     def stand(self):
@@ -143,34 +165,31 @@ class QuadrupedController:
     def lie_down(self):
         """Lie down command - lower both front and back"""
         # Lower back first
-        self.back_right.move_leg(-40, -40)
-        self.back_left.move_leg(-40, -40)
+        self.move_legs({self.back_right: (-40, -40), self.back_left: (-40, -40)})
         time.sleep(0.5)
         # Then lower front
-        self.front_right.move_leg(-30, -30)
-        self.front_left.move_leg(-30, -30)
+        self.move_legs({self.front_right: (-30, -30), self.front_left: (-30, -30)})
         time.sleep(2)  # Hold the position
 
     def beg(self):
         """Beg command - raise front legs up"""
-        # Raise front legs high
-        self.front_right.move_leg(45, 45)
-        self.front_left.move_leg(45, 45)
-        # Adjust back legs for balance
-        self.back_right.move_leg(-20, -20)
-        self.back_left.move_leg(-20, -20)
+        # Raise front legs high and adjust back legs for balance, together
+        self.move_legs({
+            self.front_right: (45, 45),
+            self.front_left: (45, 45),
+            self.back_right: (-20, -20),
+            self.back_left: (-20, -20),
+        })
         time.sleep(2)  # Hold the begging position
         self.reset_all()
 
     def stretch(self):
         """Do a playful stretch"""
         # Front legs forward stretch
-        self.front_right.move_leg(-30, 20)
-        self.front_left.move_leg(-30, 20)
+        self.move_legs({self.front_right: (-30, 20), self.front_left: (-30, 20)})
         time.sleep(1)
         # Back legs stretch
-        self.back_right.move_leg(20, -30)
-        self.back_left.move_leg(20, -30)
+        self.move_legs({self.back_right: (20, -30), self.back_left: (20, -30)})
         time.sleep(1)
         self.reset_all()
 
@@ -178,12 +197,10 @@ class QuadrupedController:
         """Wag movement to show happiness"""
         for _ in range(4):  # Wag 4 times
             # Move back legs right
-            self.back_right.move_leg(15, 15)
-            self.back_left.move_leg(-15, -15)
+            self.move_legs({self.back_right: (15, 15), self.back_left: (-15, -15)})
             time.sleep(0.2)
             # Move back legs left
-            self.back_right.move_leg(-15, -15)
-            self.back_left.move_leg(15, 15)
+            self.move_legs({self.back_right: (-15, -15), self.back_left: (15, 15)})
             time.sleep(0.2)
         self.reset_all()
 
@@ -196,58 +213,96 @@ class QuadrupedController:
         self.beg()
         
     
-    def walk(self, speed):
+    def start_walk(self, speed=1, gait='trot', stride=1.0, duty=0.6, compiled=False):
+        """
+        Start walking without blocking, or change the running gait mid-stride.
+        The gait is a driver of the scheduler's control loop, so it moves
+        while scheduler.run() or scheduler.start() is ticking.
+        
+        compiled plays a precompiled, disk-cached table of the gait instead
+        of computing it every tick; gait may then also be 'classic', the
+        keyframed walk this controller used to step through.
+        """
         if speed <= 0:
             raise ValueError("Speed must be positive")
-        
-        # Configuration parameters
-        base_delay = 1.0 / speed  # Base timing unit
-        step_delay = base_delay * 0.25  # Individual step timing
-        
-        # Movement parameters - different for inner and outer servos
-        inner_lift = 15  # Inner servo lift angle
-        outer_lift = 5  # Outer servo lift angle
-        inner_push = -15  # Inner servo push angle
-        outer_push = -25  # Outer servo push angle
-        
+        frequency = speed * CYCLES_PER_SPEED
+        if compiled:
+            table = gait_table.gait_table(gait, frequency, stride, duty, self.scheduler.rate)
+            if self.gait is None:
+                self.gait = gait_table.TablePlayer(table)
+                # Ease into the first row, so the first tick does not jump to it
+                self._move_to(self.gait.rows[0])
+                self.scheduler.add_driver(self._table_tick)
+            elif isinstance(self.gait, gait_table.TablePlayer):
+                self.gait.switch(table)
+            else:
+                raise RuntimeError("Stop the running gait before switching to a compiled one")
+        elif self.gait is None:
+            self.gait = CPG(gait, frequency, stride, duty)
+            # The stride starts at zero: ease into the standing pose it glides up from
+            self._move_to((self.gait.angles() * (-1, 1)).ravel().tolist())
+            self.scheduler.add_driver(self._gait_tick)
+        elif isinstance(self.gait, CPG):
+            self.gait.set_gait(gait)
+            self.gait.frequency = frequency
+            self.gait.stride = stride
+            self.gait.duty = duty
+        else:
+            raise RuntimeError("Stop the compiled gait before switching to a live one")
+            
+    def stop_walk(self):
+        """
+        Glide the stride down to nothing, or for a compiled gait finish the
+        cycle; the gait ends once the legs are still
+        """
+        if isinstance(self.gait, gait_table.TablePlayer):
+            self.gait.stop()
+        elif self.gait is not None:
+            self.gait.stride = 0
+            
+    def _move_to(self, angles):
+        """Move the eight leg servos, in _leg_servos order, to angles within their limits"""
+        self.scheduler.move(dict(zip(self._leg_servos, angles)))
+
+    def _gait_tick(self, dt):
+        if self.gait.settled():
+            self.gait = None
+            return None
+        # All eight leg servos in one go; inner servos are mounted reversed
+        angles = self.gait.step(dt) * (-1, 1)
+        return dict(zip(self._leg_servos, angles.ravel().tolist()))
+            
+    def _table_tick(self, dt):
+        row = self.gait.next_row()
+        if row is None:
+            self.gait = None
+            return None
+        return dict(zip(self._leg_servos, row))
+    
+    def walk(self, speed, gait='trot', duration=None, compiled=False):
+        """
+        Walk until stop_walk() (from another thread), `duration` seconds or
+        Ctrl+C, then come to a stop and return to neutral
+        """
         # Neutral position slightly forward-leaning for stability
         neutral_inner = -10
         neutral_outer = 10
         
-        def move_pair(leg1, leg2, inner_angle, outer_angle):
-            """Helper to move a pair of legs together"""
-            leg1.move_leg(inner_angle, outer_angle)
-            leg2.move_leg(inner_angle, outer_angle)
-            time.sleep(step_delay)
+        self.start_walk(speed, gait, compiled=compiled)
+        end_tick = None if duration is None else self.scheduler.ticks + round(duration * self.scheduler.rate)
+        
+        def stopped():
+            if end_tick is not None and self.scheduler.ticks >= end_tick:
+                self.stop_walk()
+            return self.gait is None
         
-        # Walking cycle
         try:
-            while True:  # Can be interrupted with Ctrl+C
-                # Phase 1: Lift and forward swing diagonal pair (FR + BL)
-                move_pair(self.front_right, self.back_left, inner_lift, outer_lift)
-                
-                # Phase 2: Plant and push with diagonal pair (FR + BL)
-                move_pair(self.front_right, self.back_left, inner_push, outer_push)
-                
-                # Phase 3: Other legs push back while lifted legs move
-                move_pair(self.front_left, self.back_right, inner_push*0.7, outer_push*0.7)
-                time.sleep(step_delay * 0.5)
-                
-                # Phase 4: Lift and forward swing other diagonal pair (FL + BR)
-                move_pair(self.front_left, self.back_right, inner_lift, outer_lift)
-                
-                # Phase 5: Plant and push with other diagonal pair (FL + BR)
-                move_pair(self.front_left, self.back_right, inner_push, outer_push)
-                
-                # Phase 6: First pair pushes back while second pair moves
-                move_pair(self.front_right, self.back_left, inner_push*0.7, outer_push*0.7)
-                time.sleep(step_delay * 0.5)
-                
+            self.scheduler.run(stopped)
         except KeyboardInterrupt:
-            # Graceful shutdown - return to neutral
-            all_legs = [self.front_right, self.front_left, self.back_right, self.back_left]
-            for leg in all_legs:
-                leg.move_leg(neutral_inner, neutral_outer)
+            # Graceful shutdown - finish the stride, then return to neutral
+            self.stop_walk()
+            self.scheduler.run(stopped)
+        self.move_legs({leg: (neutral_inner, neutral_outer) for leg in self.legs})
 
 
     def demo_behaviors(self):
@@ -0,0 +1,130 @@
+import math
+import threading
+import time
+
+import servo_bus
+from trajectory import Trajectory
+
+CONTROL_RATE = 50   # ticks per second; hobby servos take a new pulse width every 20 ms
+DEFAULT_SPEED = 200     # degrees per second, for servos without their own limits
+DEFAULT_ACCEL = 2000    # degrees per second squared
+
+
+class MotionScheduler:
+    """
+    Moves any set of servos together. move() takes target angles for every
+    channel of a pose (legs, neck and tail alike) and plans one Trajectory
+    for all of them: the slowest joint under its own speed and acceleration
+    limits sets the duration, and one fixed-rate tick loop writes each moving
+    servo once per tick, so a pose takes as long as its longest axis instead
+    of the sum of all of them. Writes go through a ServoBus, one flush per
+    tick, so ticks that do not change a servo's pulse width cost nothing.
+
+    Positions are remembered per servo, so every move starts from where the
+    last one left that servo.
+
+    Continuous motions (gaits) are drivers instead: add_driver(fn) has
+    fn(dt) called every tick of run(), or of the loop start() runs in the
+    background, for the {servo: angle} setpoints of that tick; a driver
+    returning None is finished and removed.
+    """
+    def __init__(self, rate=CONTROL_RATE, profile='min_jerk', bus=None, clock=time.monotonic, sleep=None):
+        self.rate = rate
+        self.bus = bus or servo_bus.bus
+        self.profile = profile
+        self.clock = clock
+        # Looked up at call time, so a patched time.sleep (simulated clock) is honoured
+        self.sleep = sleep or (lambda seconds: time.sleep(seconds))
+        self.positions = {}
+        self.limits = {}
+        self.ticks = 0
+        self.drivers = []
+        self._thread = None
+        self._running = False
+
+    def position(self, servo):
+        return self.positions.get(servo, 0)
+
+    def set_limits(self, servo, speed, accel=math.inf):
+        """Top speed (deg/s) and acceleration (deg/s^2) of a servo's moves"""
+        self.limits[servo] = (speed, accel)
+
+    def plan(self, targets, speed=None, accel=None, duration=None):
+        """
+        Trajectory of a move to targets ({servo: angle}) over the servos that
+        actually move, and those servos. speed and accel override every
+        servo's own limits; duration is a minimum.
+        """
+        servos = [servo for servo, angle in targets.items() if angle != self.position(servo)]
+        limits = [self.limits.get(servo, (DEFAULT_SPEED, DEFAULT_ACCEL)) for servo in servos]
+        return Trajectory([self.position(servo) for servo in servos], [targets[servo] for servo in servos],
+                          [speed or v for v, _ in limits], [accel or a for _, a in limits],
+                          self.profile, duration), servos
+
+    def move(self, targets, speed=None, accel=None, duration=None):
+        """Move every servo in targets ({servo: angle}) to its angle together, blocking until done"""
+        trajectory, servos = self.plan(targets, speed, accel, duration)
+        if not servos:
+            return
+        period = 1 / self.rate
+        for angles in trajectory.sample(self.rate).tolist():
+            tick_start = self.clock()
+            with self.bus.tick():
+                for servo, angle in zip(servos, angles):
+                    self.bus.write(servo, angle)
+                    self.positions[servo] = angle
+            self.ticks += 1
+            self.sleep(max(0, period - (self.clock() - tick_start)))
+
+    def add_driver(self, driver):
+        self.drivers.append(driver)
+
+    def remove_driver(self, driver):
+        if driver in self.drivers:
+            self.drivers.remove(driver)
+
+    def tick(self):
+        """One control tick: collect every driver's setpoints and write them in one flush"""
+        tick_start = self.clock()
+        dt = 1 / self.rate
+        with self.bus.tick():
+            for driver in list(self.drivers):
+                targets = driver(dt)
+                if targets is None:
+                    self.remove_driver(driver)
+                    continue
+                for servo, angle in targets.items():
+                    self.bus.write(servo, angle)
+                    self.positions[servo] = angle
+        self.ticks += 1
+        self.sleep(max(0, dt - (self.clock() - tick_start)))
+
+    def run(self, until=None):
+        """Tick until every driver has finished, or until() returns True"""
+        while self.drivers and not (until and until()):
+            self.tick()
+
+    def start(self):
+        """Run the control loop on a background thread until stop()"""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while self._running:
+            if self.drivers:
+                self.tick()
+            else:
+                self.sleep(1 / self.rate)
+
+
+# Shared by every controller unless one is given its own, so a gesture can
+# mix leg, neck and tail servos in a single move()
+scheduler = MotionScheduler()
@@ -1,6 +1,8 @@
 from robot_hat import Servo
 import time
 
+import motion
+
 class NeckController:
     """
     Controls the pan-tilt neck mechanism of a robot pet
@@ -8,62 +10,74 @@ class NeckController:
     Pin 3: Up-down movement (tilt)
     Safety limits: -30 to 30 degrees for both servos
     """
-    def __init__(self, pan_pin=2, tilt_pin=3):
+    def __init__(self, pan_pin=2, tilt_pin=3, scheduler=None):
         self.pan_servo = Servo(f"P{pan_pin}")   # Left-right movement
         self.tilt_servo = Servo(f"P{tilt_pin}") # Up-down movement
-        self.delay = 0.005
+        self.scheduler = scheduler or motion.scheduler
+        # Peak speed; smooth moves average about half of it, as the old 5 ms per degree did
+        self.speed = 375    # degrees per second
+        self.accel = 12000  # degrees per second squared
+        self.scheduler.set_limits(self.pan_servo, self.speed, self.accel)
+        self.scheduler.set_limits(self.tilt_servo, self.speed, self.accel)
         
         # Define safety limits
         self.MAX_ANGLE = 30
         self.MIN_ANGLE = -30
         
         # Initialize position to center
-        self.current_pan = 0
-        self.current_tilt = 0
         self.center()
         
+    @property
+    def current_pan(self):
+        """Pan angle the servo was last moved to"""
+        return self.scheduler.position(self.pan_servo)
+        
+    @property
+    def current_tilt(self):
+        """Tilt angle the servo was last moved to"""
+        return self.scheduler.position(self.tilt_servo)
+        
     def _safe_angle(self, angle):
         """Ensure angle stays within safe limits"""
         return max(min(angle, self.MAX_ANGLE), self.MIN_ANGLE)
         
-    def _move_servo_smooth(self, servo, start_angle, end_angle, step=1):
-        """Move servo smoothly from start to end angle"""
-        direction = 1 if end_angle > start_angle else -1
-        for angle in range(start_angle, end_angle, direction):
-            safe_angle = self._safe_angle(angle)
-            servo.angle(safe_angle)
-            time.sleep(self.delay)
+    def targets(self, pan=None, tilt=None):
+        """Clamped servo angles for a head pose, to move together with other servos"""
+        targets = {}
+        if pan is not None:
+            targets[self.pan_servo] = self._safe_angle(pan)
+        if tilt is not None:
+            targets[self.tilt_servo] = self._safe_angle(tilt)
+        return targets
+        
+    def _move_servo_smooth(self, servo, angle):
+        """Move servo smoothly to angle, starting from wherever it is"""
+        self.scheduler.move({servo: self._safe_angle(angle)}, self.speed, self.accel)
             
     def center(self):
         """Return head to center position"""
-        self._move_servo_smooth(self.pan_servo, self.current_pan, 0)
-        self._move_servo_smooth(self.tilt_servo, self.current_tilt, 0)
-        self.current_pan = 0
-        self.current_tilt = 0
+        # Pan and tilt move together
+        self.scheduler.move(self.targets(0, 0), self.speed, self.accel)
         
     def look_left(self, angle=30):
         """Turn head left"""
         safe_angle = self._safe_angle(angle)
-        self._move_servo_smooth(self.pan_servo, self.current_pan, safe_angle)
-        self.current_pan = safe_angle
+        self._move_servo_smooth(self.pan_servo, safe_angle)
         
     def look_right(self, angle=30):
         """Turn head right"""
         safe_angle = self._safe_angle(-angle)
-        self._move_servo_smooth(self.pan_servo, self.current_pan, safe_angle)
-        self.current_pan = safe_angle
+        self._move_servo_smooth(self.pan_servo, safe_angle)
         
     def look_up(self, angle=30):
         """Tilt head up"""
         safe_angle = self._safe_angle(angle)
-        self._move_servo_smooth(self.tilt_servo, self.current_tilt, safe_angle)
-        self.current_tilt = safe_angle
+        self._move_servo_smooth(self.tilt_servo, safe_angle)
         
     def look_down(self, angle=30):
         """Tilt head down"""
         safe_angle = self._safe_angle(-angle)
-        self._move_servo_smooth(self.tilt_servo, self.current_tilt, safe_angle)
-        self.current_tilt = safe_angle
+        self._move_servo_smooth(self.tilt_servo, safe_angle)
         
     def nod_yes(self, cycles=2, angle=20):
         """Nod head up and down"""
@@ -72,13 +86,11 @@ class NeckController:
         
         for _ in range(cycles):
             # Look down
-            self._move_servo_smooth(self.tilt_servo, original_tilt, -safe_angle)
+            self._move_servo_smooth(self.tilt_servo, -safe_angle)
             # Look up
-            self._move_servo_smooth(self.tilt_servo, -safe_angle, safe_angle)
+            self._move_servo_smooth(self.tilt_servo, safe_angle)
             # Return to starting position
-            self._move_servo_smooth(self.tilt_servo, safe_angle, original_tilt)
-        
-        self.current_tilt = original_tilt
+            self._move_servo_smooth(self.tilt_servo, original_tilt)
             
     def nod_no(self, cycles=2, angle=20):
         """Shake head left and right"""
@@ -87,13 +99,11 @@ class NeckController:
         
         for _ in range(cycles):
             # Look left
-            self._move_servo_smooth(self.pan_servo, original_pan, safe_angle)
+            self._move_servo_smooth(self.pan_servo, safe_angle)
             # Look right
-            self._move_servo_smooth(self.pan_servo, safe_angle, -safe_angle)
+            self._move_servo_smooth(self.pan_servo, -safe_angle)
             # Return to starting position
-            self._move_servo_smooth(self.pan_servo, -safe_angle, original_pan)
-        
-        self.current_pan = original_pan
+            self._move_servo_smooth(self.pan_servo, original_pan)
 
 # Usage example:
 def demo_neck():
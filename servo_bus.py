@@ -0,0 +1,107 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# How robot_hat's Servo turns an angle into a PWM register value
+MIN_PW = 500        # microseconds at -90 degrees
+MAX_PW = 2500       # microseconds at +90 degrees
+PWM_PERIOD_US = 20000
+PWM_COUNTS = 4095
+
+
+def pulse_counts(angle):
+    """PWM register value robot_hat writes for an angle; angles that share one are the same pulse"""
+    angle = max(-90, min(90, angle))
+    pulse_us = MIN_PW + (angle + 90) * (MAX_PW - MIN_PW) / 180
+    return int(pulse_us / PWM_PERIOD_US * PWM_COUNTS)
+
+
+class ServoBus:
+    """
+    Every servo write goes through here. Writes made inside a tick() are
+    coalesced per servo, newest wins, and sent together when the tick ends;
+    a write whose pulse width is the one the servo already has is dropped.
+    Writes outside a tick go out straight away, with the same check.
+    Ticks are per thread: a tick batches only the writes of the thread that
+    opened it, so a control loop on one thread neither holds back nor
+    flushes early the writes of another.
+
+    issued and suppressed count bus transactions sent and dropped per
+    channel. The bus assumes it is the only writer: after writing a servo
+    some other way, invalidate() it.
+    """
+    def __init__(self):
+        self.issued = Counter()
+        self.suppressed = Counter()
+        self._counts = {}
+        self._local = threading.local()     # this thread's tick depth and pending writes
+        self._lock = threading.RLock()
+
+    def _batch(self):
+        local = self._local
+        if not hasattr(local, 'pending'):
+            local.pending = {}
+            local.depth = 0
+        return local
+
+    def write(self, servo, angle):
+        batch = self._batch()
+        with self._lock:
+            if servo in batch.pending:
+                # Replaced before it was sent
+                self.suppressed[self._channel(servo)] += 1
+            batch.pending[servo] = angle
+        if not batch.depth:
+            self.flush()
+
+    @contextmanager
+    def tick(self):
+        """Batch every write this thread makes inside the block into one flush at its end"""
+        batch = self._batch()
+        batch.depth += 1
+        try:
+            yield self
+        finally:
+            batch.depth -= 1
+            if not batch.depth:
+                self.flush()
+
+    def flush(self):
+        """Send this thread's pending writes"""
+        batch = self._batch()
+        with self._lock:
+            pending, batch.pending = batch.pending, {}
+            for servo, angle in pending.items():
+                counts = pulse_counts(angle)
+                channel = self._channel(servo)
+                if self._counts.get(servo) == counts:
+                    self.suppressed[channel] += 1
+                    continue
+                servo.angle(angle)
+                self._counts[servo] = counts
+                self.issued[channel] += 1
+
+    def invalidate(self, servo=None):
+        """Forget what a servo (or every servo) was last sent, so the next write goes out"""
+        with self._lock:
+            if servo is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(servo, None)
+
+    def stats(self):
+        """{channel: (issued, suppressed)} for every channel written so far"""
+        channels = set(self.issued) | set(self.suppressed)
+        return {channel: (self.issued[channel], self.suppressed[channel]) for channel in sorted(channels, key=str)}
+
+    def reset_stats(self):
+        self.issued.clear()
+        self.suppressed.clear()
+
+    @staticmethod
+    def _channel(servo):
+        return getattr(servo, 'channel', servo)
+
+
+# Shared by every controller, so all servo traffic is counted in one place
+bus = ServoBus()
@@ -3,39 +3,48 @@ import time
 from threading import Thread
 import math
 
+import motion
+
+# Compensation for the 45-degree mounting angle
+MOUNT_SCALE = math.cos(math.pi/4)
+
 class TailController:
     """
     Controls the tail servo of a robot pet, handling different emotional states
     The tail is mounted at 45 degrees to the robot's length
     """
-    def __init__(self, pin_number=1):
+    def __init__(self, pin_number=1, scheduler=None):
         self.servo = Servo(f"P{pin_number}")
+        self.scheduler = scheduler or motion.scheduler
         self.is_running = False
         self.background_thread = None
-        self.delay = 0.005
+        # Peak speed; smooth moves average about half of it, as the old 5 ms per degree did
+        self.speed = 375    # degrees per second of tail swing
+        self.accel = 12000  # degrees per second squared
+        self.scheduler.set_limits(self.servo, self.speed * MOUNT_SCALE, self.accel * MOUNT_SCALE)
         
         # Define movement parameters
         self.normal_angle = 15  # Small angle for normal state
         self.emotion_angle = 30  # Larger angle for emotional states
         
-    def _move_servo(self, start_angle, end_angle, step=1):
-        """Helper method to move servo smoothly between angles"""
-        direction = 1 if end_angle > start_angle else -1
-        for angle in range(start_angle, end_angle, direction):
-            # Compensate for 45-degree mounting angle
-            adjusted_angle = angle * math.cos(math.pi/4)  # 45 degrees in radians
-            self.servo.angle(adjusted_angle)
-            time.sleep(self.delay)
+    def targets(self, angle):
+        """Servo angle for a tail angle, to move together with other servos"""
+        return {self.servo: angle * MOUNT_SCALE}
+            
+    def _move_servo(self, angle):
+        """Helper method to move servo smoothly to angle, starting from wherever it is"""
+        # Limits are in tail degrees, the servo turns MOUNT_SCALE as far
+        self.scheduler.move(self.targets(angle), self.speed * MOUNT_SCALE, self.accel * MOUNT_SCALE)
             
     def _normal_behavior(self):
         """Continuous gentle wagging for normal state"""
         while self.is_running:
             # Move right
-            self._move_servo(0, self.normal_angle)
+            self._move_servo(self.normal_angle)
             # Move left
-            self._move_servo(self.normal_angle, -self.normal_angle)
+            self._move_servo(-self.normal_angle)
             # Return to center
-            self._move_servo(-self.normal_angle, 0)
+            self._move_servo(0)
             time.sleep(1)  # Pause between wags
             
     def start_normal(self):
@@ -50,30 +59,30 @@ class TailController:
         self.is_running = False
         if self.background_thread:
             self.background_thread.join()
-        self.servo.angle(0)
+        self.scheduler.move(self.targets(0))
             
     def happy_wag(self):
         """One-time enthusiastic tail wag"""
         self.stop_normal()  # Stop normal behavior if running
         
         # Quick, enthusiastic wag
-        self._move_servo(0, self.emotion_angle)
-        self._move_servo(self.emotion_angle, -self.emotion_angle)
-        self._move_servo(-self.emotion_angle, 0)
+        self._move_servo(self.emotion_angle)
+        self._move_servo(-self.emotion_angle)
+        self._move_servo(0)
         
     def sad_wag(self):
         """One-time slow, droopy tail movement"""
         self.stop_normal()  # Stop normal behavior if running
         
         # Slow, deliberate movement
-        original_delay = self.delay
-        self.delay = 0.015  # Slower movement for sad emotion
+        original_speed = self.speed
+        self.speed = 125  # Slower movement for sad emotion
         
-        self._move_servo(0, -self.emotion_angle)
+        self._move_servo(-self.emotion_angle)
         time.sleep(0.5)  # Pause in drooped position
-        self._move_servo(-self.emotion_angle, 0)
+        self._move_servo(0)
         
-        self.delay = original_delay  # Restore original delay
+        self.speed = original_speed  # Restore original speed
 
 # Usage example:
 def demo_tail():
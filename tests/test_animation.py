@@ -0,0 +1,29 @@
+import numpy as np
+
+from face import robot_face
+from face.animation import Tween, style_vector, vector_style
+
+EMOTIONS = robot_face.EMOTIONS
+
+
+def test_tween_runs_from_start_to_end_style():
+    tween = Tween(EMOTIONS['curious'], EMOTIONS['sleepy'], 0.4)
+    table = tween.table(30)
+    assert len(table) == 13
+    assert table[0] == vector_style(style_vector(EMOTIONS['curious']))
+    assert table[-1] == tween.at(1.0) == vector_style(style_vector(EMOTIONS['sleepy']))
+
+
+def test_tween_eases_monotonically():
+    tween = Tween(EMOTIONS['normal'], EMOTIONS['happy'], 0.4)
+    heights = tween.vectors(np.linspace(0, 0.4, 50))[:, 1]
+    steps = np.diff(heights) * np.sign(heights[-1] - heights[0])
+    assert (steps >= 0).all()
+    # Eased in and out: slow at both ends
+    assert abs(steps[0]) < abs(steps[25]) and abs(steps[-1]) < abs(steps[25])
+
+
+def test_vector_style_keeps_different_pupils():
+    style = vector_style(style_vector(dict(EMOTIONS['normal'], pupil_offset=(5, -3), different_pupils=True)))
+    assert style['pupil_offsets'] == ((5, -3), (-5, -3))
+
@@ -0,0 +1,208 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from hw_drivers.display.LCD_1inch69 import LCD_1inch69
+from hw_drivers.display.display_writer import DisplayWriter
+from hw_drivers.display.dual_display import DualDisplay
+from hw_drivers.display.emulator import ST7789Emulator
+
+FORMATS = ('rgb565', 'rgb444', 'rgb666')
+SHAPES = {'landscape': (240, 280), 'portrait': (280, 240)}
+
+
+def make_display(**kwargs):
+    emu = ST7789Emulator()
+    disp = LCD_1inch69(spi=emu, gpio=emu, max_transfer=4096, **kwargs)
+    disp.Init()
+    return disp, emu
+
+
+def expected_rgb(img, pixel_format):
+    """What the glass shows for an RGB888 image sent in a pixel format"""
+    img = img.astype(np.uint16)
+    if pixel_format == 'rgb444':
+        return ((img >> 4) * 0x11).astype(np.uint8)
+    if pixel_format == 'rgb666':
+        return ((img & 0xFC) | (img >> 6)).astype(np.uint8)
+    r, g, b = img[..., 0] >> 3, img[..., 1] >> 2, img[..., 2] >> 3
+    return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=-1).astype(np.uint8)
+
+
+def rgb565(img):
+    img = img.astype(np.uint16)
+    return (((img[..., 0] & 0xF8) << 8) | ((img[..., 1] & 0xFC) << 3) | (img[..., 2] >> 3)).astype('>u2')
+
+
+def unpack(frame):
+    """RGB565 frame back to RGB888 with the low bits replicated, as the panel shows it"""
+    v = frame.astype(np.uint16)
+    r, g, b = (v >> 11) & 0x1F, (v >> 5) & 0x3F, v & 0x1F
+    return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=-1).astype(np.uint8)
+
+
+def screen_rgb565(emu, landscape):
+    return rgb565(emu.screen(landscape=landscape))
+
+
+def random_image(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (*shape, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('pixel_format', FORMATS)
+@pytest.mark.parametrize('orientation', SHAPES)
+def test_screen_matches_image(pixel_format, orientation):
+    disp, emu = make_display(pixel_format=pixel_format)
+    img = random_image(SHAPES[orientation])
+    disp.ShowImage(Image.fromarray(img))
+    screen = emu.screen(landscape=orientation == 'landscape')
+    assert np.array_equal(screen, expected_rgb(img, pixel_format))
+
+
+@pytest.mark.parametrize('pixel_format', FORMATS)
+@pytest.mark.parametrize('orientation', SHAPES)
+def test_full_frame_bytes(pixel_format, orientation):
+    disp, emu = make_display(pixel_format=pixel_format)
+    disp.partial_refresh = False
+    frame = rgb565(random_image(SHAPES[orientation]))
+    disp.ShowFrame(frame)
+    emu.mark_frame()
+    disp.ShowFrame(frame)
+    pixels = frame.size * LCD_1inch69.PIXEL_FORMATS[pixel_format][1]
+    # The window registers already hold the full frame, so only RAMWR goes before the pixels
+    assert disp.frame_bytes == pixels + 1
+    assert emu.mark_frame()['bytes'] == disp.frame_bytes
+
+
+def test_unchanged_frame_sends_nothing():
+    disp, emu = make_display()
+    frame = rgb565(random_image(SHAPES['landscape']))
+    disp.ShowFrame(frame)
+    disp.ShowFrame(frame.copy())
+    assert disp.frame_bytes == 0
+    assert disp.dirty_rects == []
+
+
+@pytest.mark.parametrize('pixel_format', FORMATS)
+def test_dirty_rects_cover_every_change(pixel_format):
+    disp, emu = make_display(pixel_format=pixel_format)
+    rng = np.random.default_rng(1)
+    frame = rgb565(random_image(SHAPES['landscape']))
+    disp.ShowFrame(frame)
+    for _ in range(20):
+        new = frame.copy()
+        # A few scattered patches, sometimes more than max_dirty_rects of them
+        for _ in range(rng.integers(1, 10)):
+            x, y = rng.integers(0, 270), rng.integers(0, 230)
+            w, h = rng.integers(1, 10), rng.integers(1, 10)
+            new[y:y + h, x:x + w] = rng.integers(0, 0x10000)
+        disp.ShowFrame(new)
+        covered = np.zeros(new.shape, dtype=bool)
+        for x0, y0, x1, y1 in disp.dirty_rects:
+            covered[y0:y1, x0:x1] = True
+        assert not (new != frame)[~covered].any()
+        assert np.array_equal(emu.screen(landscape=True), expected_rgb(unpack(new), pixel_format))
+        frame = new
+
+
+def test_damage_rects_replace_the_diff():
+    disp, emu = make_display()
+    frame = np.zeros(SHAPES['landscape'], dtype='>u2')
+    disp.ShowFrame(frame)
+    frame[10:20, 30:50] = 0xFFFF
+    disp.ShowFrame(frame, rects=[(30, 10, 50, 20)])
+    assert disp.dirty_rects == [(30, 10, 50, 20)]
+    assert disp.frame_bytes == 20 * 10 * 2 + 5 + 5 + 1
+    assert np.array_equal(screen_rgb565(emu, True), frame)
+
+
+def test_writer_carries_damage_of_dropped_frames():
+    shown = []
+
+    class Panel:
+        def ShowFrame(self, frame, rects=None):
+            shown.append((frame, rects))
+
+    writer = DisplayWriter(Panel())
+    # Not started yet, so the second frame replaces the first in the mailbox
+    writer.submit_frame('first', rects=[(0, 0, 10, 10)])
+    writer.submit_frame('second', rects=[(20, 20, 30, 30)])
+    writer.start()
+    writer.stop()
+    assert shown == [('second', [(0, 0, 10, 10), (20, 20, 30, 30)])]
+    assert writer.frames_dropped == 1
+
+
+def test_writer_holds_frames_until_they_are_sent():
+    writer = DisplayWriter(SimpleNamespace(ShowFrame=lambda frame, rects=None: None))
+    frame, other = np.zeros(4, dtype='>u2'), np.zeros(4, dtype='>u2')
+    writer.submit_frame(frame)
+    assert writer.in_use(frame) and not writer.in_use(other)
+    writer.start()
+    writer.stop()
+    assert not writer.in_use(frame)
+
+
+def test_format_change_resends_the_frame():
+    disp, emu = make_display()
+    frame = rgb565(random_image(SHAPES['landscape']))
+    disp.ShowFrame(frame)
+    disp.pixel_format = 'rgb444'
+    disp.ShowFrame(frame)
+    assert disp.frame_bytes > frame.size * 1.5
+    assert np.array_equal(emu.screen(landscape=True), expected_rgb(unpack(frame), 'rgb444'))
+
+
+@pytest.mark.parametrize('orientation', SHAPES)
+@pytest.mark.parametrize('base', (0, 37))
+@pytest.mark.parametrize('reverse', (False, True))
+def test_slide_ends_on_frame(orientation, base, reverse):
+    disp, emu = make_display()
+    landscape = orientation == 'landscape'
+    disp.Scroll(base)
+    disp.ShowFrame(rgb565(random_image(SHAPES[orientation], seed=1)))
+    frame = rgb565(random_image(SHAPES[orientation], seed=2))
+    steps = sum(1 for _ in disp.slide_steps(frame, step=20, reverse=reverse))
+    assert steps == -(-disp.height // 20)
+    assert disp.scroll_offset == base
+    assert np.array_equal(screen_rgb565(emu, landscape), frame)
+    if not base:
+        # The next frame is diffed against what the slide left on the panel
+        disp.ShowFrame(frame)
+        assert disp.frame_bytes == 0
+
+
+def test_dual_display_shows_both_eyes():
+    (left, left_emu), (right, right_emu) = make_display(), make_display()
+    dual = DualDisplay(left, right)
+    frames = [rgb565(random_image(SHAPES['landscape'], seed)) for seed in (1, 2)]
+    left_emu.mark_frame()
+    right_emu.mark_frame()
+    dual.ShowFrame(frames)
+    assert np.array_equal(left_emu.screen(landscape=True), unpack(frames[0]))
+    assert np.array_equal(right_emu.screen(landscape=True), unpack(frames[1]))
+    assert dual.frame_bytes == left_emu.mark_frame()['bytes'] + right_emu.mark_frame()['bytes']
+
+
+def test_dual_display_rects_and_slide():
+    (left, left_emu), (right, right_emu) = make_display(), make_display()
+    dual = DualDisplay(left, right)
+    frames = [np.zeros(SHAPES['landscape'], dtype='>u2') for _ in range(2)]
+    dual.ShowFrame(frames)
+    rects = [(40, 80, 120, 160)]
+    for frame in frames:
+        frame[80:160, 40:120] = 0xFFFF
+    dual.ShowFrame(frames, rects=rects)
+    assert left.dirty_rects == right.dirty_rects == rects
+    dual.Slide([frame + 1 for frame in frames], fps=1e9)
+    for emu, frame in ((left_emu, frames[0]), (right_emu, frames[1])):
+        assert np.array_equal(screen_rgb565(emu, True), frame + 1)
+
+
+def test_writer_holds_both_frames_of_a_pair():
+    writer = DisplayWriter(SimpleNamespace(ShowFrame=lambda frames, rects=None: None))
+    pair = (np.zeros(4, dtype='>u2'), np.zeros(4, dtype='>u2'))
+    writer.submit_frame(pair)
+    assert writer.in_use(pair[0]) and writer.in_use(pair[1])
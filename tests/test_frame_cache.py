@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from face.frame_cache import FrameCache
+
+
+def frame(value, size=100):
+    return np.full(size, value, dtype='>u2')
+
+
+def test_least_recently_used_is_evicted_over_budget():
+    cache = FrameCache(budget=3 * 200)
+    for key in 'abc':
+        cache.put(key, frame(ord(key)))
+    cache.get('a')
+    cache.put('d', frame(0))
+    assert 'b' not in cache and all(key in cache for key in 'acd')
+    assert cache.nbytes == 600 and cache.evictions == 1
+
+
+def test_stored_frames_are_read_only_copies():
+    cache = FrameCache()
+    original = frame(1)
+    stored = cache.put('a', original)
+    original[:] = 2
+    assert cache.get('a') is stored and (stored == 1).all()
+    with pytest.raises(ValueError):
+        stored[0] = 3
+
+
+def test_get_or_render_renders_once():
+    cache = FrameCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_render('a', lambda: calls.append(1) or frame(1))
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_blink_is_quantised():
+    cache = FrameCache(blink_steps=16)
+    assert [cache.blink_step(p) for p in (-0.5, 0, 0.03, 0.5, 1, 2)] == [0, 0, 0, 8, 16, 16]
+    assert cache.blink_progress(cache.blink_step(0.5)) == 0.5
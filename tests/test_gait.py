@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from gait import CPG, GAITS
+
+DT = 1 / 50
+
+
+def relative_phase(cpg):
+    return (cpg.phase - cpg.phase[0]) % 1.0
+
+
+@pytest.mark.parametrize('old, new', [(a, b) for a in GAITS for b in GAITS if a != b])
+def test_switching_gait_converges(old, new):
+    cpg = CPG(old)
+    for _ in range(50):
+        cpg.step(DT)
+    cpg.set_gait(new)
+    # Within two seconds, even between gaits half a cycle apart
+    for _ in range(100):
+        cpg.step(DT)
+    error = (relative_phase(cpg) - np.array(GAITS[new]) + 0.5) % 1.0 - 0.5
+    assert np.abs(error).max() < 0.02
+
+
+def test_changes_mid_stride_are_smooth():
+    cpg = CPG('trot')
+    last = cpg.step(DT)
+    steps = []
+    for tick in range(300):
+        if tick == 40:
+            cpg.frequency, cpg.stride, cpg.duty = 1.2, 1.5, 0.5
+        if tick == 120:
+            cpg.set_gait('walk')
+        angles = cpg.step(DT)
+        steps.append(np.abs(angles - last).max())
+        last = angles
+    assert max(steps) < 8
+
+
+def test_gait_starts_from_standing():
+    cpg = CPG('trot')
+    standing = cpg.angles()
+    assert np.abs(standing - (0.0, -10.0)).max() < 1e-9
+    # The first ticks stay close to it while the stride glides up
+    assert np.abs(cpg.step(DT) - standing).max() < 2
+
+
+def test_zero_stride_settles():
+    cpg = CPG('trot')
+    for _ in range(20):
+        cpg.step(DT)
+    cpg.stride = 0
+    assert not cpg.settled()
+    for _ in range(100):
+        angles = cpg.step(DT)
+    assert cpg.settled()
+    assert np.abs(angles - (0.0, -10.0)).max() < 1
@@ -0,0 +1,70 @@
+import numpy as np
+
+import gait_table
+from gait_table import GaitCache, TablePlayer
+
+
+def test_cache_round_trip(tmp_path):
+    cache = GaitCache(str(tmp_path))
+    table = gait_table.gait_table('trot', 0.57, cache=cache)
+    assert cache.compiled == 1
+    assert np.array_equal(table, gait_table.compile_cpg('trot', 0.57))
+
+    # A fresh cache, as in a new process, reads the same table back without compiling
+    again = GaitCache(str(tmp_path))
+    loaded = gait_table.gait_table('trot', 0.57, cache=again)
+    assert again.compiled == 0
+    assert isinstance(loaded, np.memmap)
+    assert loaded.dtype == np.float32
+    assert np.array_equal(loaded, table)
+
+
+def test_cache_keys_by_parameters(tmp_path):
+    cache = GaitCache(str(tmp_path))
+    trot = gait_table.gait_table('trot', 0.57, cache=cache)
+    assert gait_table.gait_table('trot', 0.57, cache=cache) is trot
+    gait_table.gait_table('trot', 0.57, stride=0.5, cache=cache)
+    gait_table.gait_table('classic', 0.57, cache=cache)
+    assert cache.compiled == 3
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_default_cache_is_looked_up_per_call(tmp_path, monkeypatch):
+    cache = GaitCache(str(tmp_path))
+    monkeypatch.setattr(gait_table, 'cache', cache)
+    gait_table.gait_table('pace', 0.57)
+    assert cache.compiled == 1
+
+
+def test_tables_loop_seamlessly():
+    for table in (gait_table.compile_cpg('walk', 0.57), gait_table.compile_keyframes(gait_table.CLASSIC_WALK)):
+        steps = np.abs(np.diff(np.vstack([table, table[:1]]), axis=0))
+        assert steps.max() < 5
+
+
+def test_player_switches_in_step_and_stops_at_the_end_of_a_cycle():
+    player = TablePlayer(np.arange(8, dtype=np.float32).reshape(4, 2))
+    player.next_row()
+    player.next_row()
+    # Halfway through one table is halfway through the next
+    player.switch(np.zeros((8, 2), dtype=np.float32))
+    assert player.index == 4
+    player.stop()
+    rows = []
+    while (row := player.next_row()) is not None:
+        rows.append(row)
+    assert len(rows) == 4 and player.index == 0
+
+
+def test_player_switch_cancels_stop():
+    player = TablePlayer(np.arange(8, dtype=np.float32).reshape(4, 2))
+    player.next_row()
+    player.stop()
+    player.switch(np.zeros((8, 2), dtype=np.float32))
+    rows = [player.next_row() for _ in range(20)]
+    assert None not in rows
+    player.stop()
+    while player.next_row() is not None:
+        pass
+    assert player.index == 0
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from face import robot_face
+from face.gaze import GAZE_RANGE, SUBPIXEL, Gaze
+from face.governor import FrameGovernor
+
+
+def follow(gaze, fps, seconds):
+    """Offsets at every 1/30 s while updating at fps"""
+    offsets = {}
+    for i in range(int(seconds * fps) + 1):
+        offset = gaze.update(i / fps)
+        if i * 30 % fps == 0:
+            offsets[i * 30 // fps] = offset
+    return offsets
+
+
+def test_gaze_settles_on_the_target():
+    gaze = Gaze(clock=lambda: 0.0)
+    gaze.look_at(1, -2, at=0)
+    offsets = follow(gaze, 60, 2)
+    assert offsets[60] == (GAZE_RANGE[0], -GAZE_RANGE[1])
+    assert not gaze.moving
+    # Continuous: no jump of more than a few pixels between frames
+    xs = [offsets[i][0] for i in range(61)]
+    assert max(b - a for a, b in zip(xs, xs[1:])) < 4
+
+
+def test_gaze_does_not_depend_on_the_frame_rate():
+    runs = []
+    for fps in (30, 120):
+        gaze = Gaze(clock=lambda: 0.0)
+        gaze.look_at(0.5, 0.5, at=0)
+        runs.append(follow(gaze, fps, 1))
+    for t in runs[0]:
+        for a, b in zip(runs[0][t], runs[1][t]):
+            assert abs(a - b) <= 1 / SUBPIXEL
+
+
+def test_look_at_wakes_the_running_face():
+    shown = threading.Event()
+
+    class Panel:
+        def ShowFrame(self, frame, rects=None):
+            shown.set()
+
+        def Scroll(self, offset):
+            pass
+
+    face = robot_face.FaceLoop(Panel(), FrameGovernor(max_fps=robot_face.FPS, idle_wait=10), demo=False)
+    thread = threading.Thread(target=face.run)
+    thread.start()
+    try:
+        assert shown.wait(2)
+        # Let the loop go idle, then steer it from this thread as a tracker would
+        time.sleep(0.1)
+        shown.clear()
+        robot_face.look_at(1, 0)
+        assert shown.wait(1)
+    finally:
+        face.stop()
+        thread.join(2)
+    assert not thread.is_alive() and robot_face.running is None
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from face.governor import FrameGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_governor(**kwargs):
+    clock = FakeClock()
+    return FrameGovernor(clock=clock, sleep=clock.sleep, cpu_clock=clock, **kwargs), clock
+
+
+def test_idle_loop_sleeps_until_idle_wait():
+    governor, clock = make_governor(idle_wait=1.0)
+    governor.animate()
+    assert governor.wait() == 0
+    assert governor.wait() == 1.0
+
+
+def test_scheduled_change_wakes_the_loop():
+    governor, clock = make_governor()
+    governor.animate()
+    governor.wait()
+    governor.schedule(0.7)
+    governor.schedule(0.4)
+    assert governor.wait() == 0.4
+
+
+def test_animation_is_capped_at_max_fps():
+    governor, clock = make_governor(max_fps=20)
+    times = []
+    for _ in range(5):
+        governor.animate()
+        times.append(governor.wait())
+        governor.frame_shown()
+    assert [round(t, 6) for t in times] == [0, 0.05, 0.1, 0.15, 0.2]
+    assert governor.fps() == 5 / 0.2
+
+
+def test_animate_from_another_thread_wakes_the_loop():
+    governor = FrameGovernor(idle_wait=10)
+    governor.animate()
+    governor.wait()
+    threading.Timer(0.05, governor.animate).start()
+    start = time.monotonic()
+    governor.wait()
+    assert time.monotonic() - start < 1
@@ -0,0 +1,22 @@
+import numpy as np
+
+from face.headless import render_clip
+
+
+def test_same_seed_renders_the_same_clip():
+    first, _ = render_clip(8, seed=3)
+    second, _ = render_clip(8, seed=3)
+    assert first.times == second.times
+    assert np.array_equal(first.stack(), second.stack())
+    other, _ = render_clip(8, seed=4)
+    assert other.times != first.times
+
+
+def test_scenario_drives_the_face():
+    recorder, report = render_clip(3, [(1.0, 'blink')])
+    # The first face, then nothing until the blink, which ends back where it started
+    assert recorder.times[0] == 0
+    assert all(t >= 1.0 for t in recorder.times[1:])
+    assert len(recorder.frames) > 2
+    assert np.array_equal(recorder.frames[-1], recorder.frames[0])
+    assert report['frames'] == len(report['render_ms'])
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HARDWARE_MODULES = ('spidev', 'gpiozero', 'RPi', 'robot_hat')
+# Generous enough for a Pi; the face stack imports in ~15 ms on a desktop
+IMPORT_BUDGET_MS = 300
+PROBE = """
+import json, sys, time
+import numpy
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+{construct}
+print(json.dumps([elapsed * 1000, sorted(m for m in sys.modules if m.split('.')[0] in {hardware!r})]))
+"""
+
+
+@pytest.mark.parametrize('module, construct', [
+    ('hw_drivers.display.LCD_1inch69', 'hw_drivers.display.LCD_1inch69.LCD_1inch69()'),
+    ('face.robot_face', ''),
+])
+def test_import_loads_no_hardware(module, construct):
+    # A fresh interpreter, so nothing imported by other tests counts
+    code = PROBE.format(module=module, construct=construct, hardware=HARDWARE_MODULES)
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    elapsed_ms, loaded = json.loads(out)
+    assert loaded == []
+    assert elapsed_ms < IMPORT_BUDGET_MS
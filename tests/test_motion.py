@@ -0,0 +1,159 @@
+import math
+import threading
+
+import numpy as np
+import pytest
+
+from motion import MotionScheduler
+from servo_bus import ServoBus, pulse_counts
+from trajectory import Trajectory
+
+RATE = 50
+
+
+@pytest.mark.parametrize('profile', ('min_jerk', 'trapezoid'))
+def test_trajectory_within_limits(profile):
+    start, end = [0, 10, -30], [90, 12, 45]
+    speed, accel = [200, 50, 375], [2000, 500, 12000]
+    trajectory = Trajectory(start, end, speed, accel, profile)
+    t = np.linspace(0, trajectory.duration, 2001)
+    angles = trajectory.at(t)
+    velocity = np.gradient(angles, t, axis=0)
+    acceleration = np.gradient(velocity, t, axis=0)
+    # A little headroom for the finite differences
+    assert (np.abs(velocity).max(axis=0) <= np.array(speed) * 1.01).all()
+    assert (np.abs(acceleration[5:-5]).max(axis=0) <= np.array(accel) * 1.05).all()
+    # The slowest joint sets the duration and runs at one of its limits
+    slowest = np.argmax(np.abs(np.subtract(end, start)) / speed)
+    assert max(abs(velocity[:, slowest]).max() / speed[slowest],
+               abs(acceleration[5:-5, slowest]).max() / accel[slowest]) > 0.95
+
+
+@pytest.mark.parametrize('profile', ('min_jerk', 'trapezoid'))
+def test_trajectory_ends_exactly(profile):
+    trajectory = Trajectory([0, 0.3], [33.3, -17.9], 200, 2000, profile)
+    rows = trajectory.sample(RATE)
+    assert rows[-1].tolist() == [33.3, -17.9]
+    assert len(rows) == math.ceil(trajectory.duration * RATE - 1e-9)
+    # Every joint moves one way only
+    assert (np.diff(rows[:, 0]) >= 0).all() and (np.diff(rows[:, 1]) <= 0).all()
+
+
+def test_trajectory_duration_is_a_minimum():
+    trajectory = Trajectory([0], [10], 200, 2000, duration=2.0)
+    assert trajectory.duration == 2.0
+    assert len(trajectory.sample(RATE)) == 100
+
+
+def test_trajectory_without_motion():
+    rows = Trajectory([5, 5], [5, 5], 200).sample(RATE)
+    assert rows.tolist() == [[5, 5]]
+
+
+class FakeServo:
+    def __init__(self, channel):
+        self.channel = channel
+        self.writes = []
+
+    def angle(self, angle):
+        self.writes.append(angle)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_scheduler_moves_servos_together():
+    clock = FakeClock()
+    scheduler = MotionScheduler(RATE, bus=ServoBus(), clock=clock, sleep=clock.sleep)
+    pan, tilt = FakeServo('P0'), FakeServo('P1')
+    scheduler.set_limits(tilt, 30, 300)
+    trajectory, servos = scheduler.plan({pan: 90, tilt: 30})
+    assert servos == [pan, tilt]
+    # The tilt's tighter limits set the duration for both
+    assert trajectory.duration == Trajectory([0], [30], 30, 300).duration
+    scheduler.move({pan: 90, tilt: 30})
+    ticks = len(trajectory.sample(RATE))
+    assert abs(clock.now - ticks / RATE) < 1e-9
+    # At most one write per servo per tick, and only when its pulse width changes
+    for servo in (pan, tilt):
+        assert len(servo.writes) <= ticks
+        assert len({pulse_counts(angle) for angle in servo.writes}) == len(servo.writes)
+    assert pulse_counts(pan.writes[-1]) == pulse_counts(90)
+    assert pulse_counts(tilt.writes[-1]) == pulse_counts(30)
+    assert scheduler.position(pan) == 90
+    writes = len(pan.writes)
+    scheduler.move({pan: 90, tilt: 30})
+    assert len(pan.writes) == writes
+
+
+def test_bus_drops_unchanged_pulse_widths():
+    bus = ServoBus()
+    servo = FakeServo('P0')
+    bus.write(servo, 10)
+    bus.write(servo, 10)
+    # Close enough to land on the same PWM register value
+    same = next(a for a in np.arange(10.01, 11, 0.01) if pulse_counts(a) == pulse_counts(10))
+    bus.write(servo, same)
+    bus.write(servo, 20)
+    assert servo.writes == [10, 20]
+    assert bus.stats() == {'P0': (2, 2)}
+
+
+def test_bus_tick_coalesces_writes():
+    bus = ServoBus()
+    a, b = FakeServo('P0'), FakeServo('P1')
+    with bus.tick():
+        bus.write(a, 10)
+        bus.write(a, 30)
+        bus.write(b, -5)
+        with bus.tick():
+            bus.write(b, 5)
+        # Nothing goes out before the outermost tick ends
+        assert a.writes == [] and b.writes == []
+    assert a.writes == [30] and b.writes == [5]
+    assert bus.stats() == {'P0': (1, 1), 'P1': (1, 1)}
+
+
+def test_bus_invalidate_resends():
+    bus = ServoBus()
+    servo = FakeServo('P0')
+    bus.write(servo, 10)
+    bus.invalidate(servo)
+    bus.write(servo, 10)
+    assert servo.writes == [10, 10]
+
+
+def test_bus_ticks_are_per_thread():
+    bus = ServoBus()
+    leg, tail = FakeServo('P0'), FakeServo('P1')
+    opened, written = threading.Event(), threading.Event()
+    during_tick = []
+
+    def control_loop():
+        with bus.tick():
+            bus.write(leg, 10)
+            opened.set()
+            written.wait()
+            during_tick.extend(leg.writes)
+
+    thread = threading.Thread(target=control_loop)
+    thread.start()
+    opened.wait()
+    try:
+        # Outside a tick on this thread, so not held back by the other thread's tick
+        bus.write(tail, 20)
+        assert tail.writes == [20]
+    finally:
+        written.set()
+        thread.join()
+    # The other thread's write did not flush the tick's batch early
+    assert during_tick == []
+    assert leg.writes == [10]
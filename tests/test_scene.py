@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from face import robot_face, sdf
+from face.frame_cache import FrameCache
+from face.scene import FaceScene, RoundedRect, Scene
+
+
+def fresh_render(style, blink, gaze, antialias=True):
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR, antialias=antialias,
+                      pages=1)
+    scene.set_face(style, blink, gaze)
+    return scene.render()[0].copy()
+
+
+@pytest.mark.parametrize('antialias', (True, False))
+def test_damage_matches_full_render(antialias):
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR, antialias=antialias)
+    rng = random.Random(0)
+    shown = np.zeros((240, 280), dtype='>u2')
+    for _ in range(40):
+        style = robot_face.EMOTIONS[rng.choice(list(robot_face.EMOTIONS))]
+        blink = rng.choice((0, 0, rng.random(), 1))
+        gaze = (rng.uniform(-20, 20), rng.uniform(-10, 10))
+        scene.set_face(style, blink, gaze)
+        frame, rects = scene.render()
+        if frame is not None:
+            # A panel only updates the damaged rects of what it already shows
+            for x0, y0, x1, y1 in rects:
+                shown[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+        assert np.array_equal(shown, fresh_render(style, blink, gaze, antialias))
+
+
+def test_unchanged_scene_renders_nothing():
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR)
+    scene.set_face(robot_face.EMOTIONS['normal'])
+    assert scene.render()[0] is not None
+    scene.set_face(robot_face.EMOTIONS['normal'])
+    assert scene.render() == (None, [])
+
+
+def test_gaze_only_damages_the_pupils():
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR)
+    style = robot_face.EMOTIONS['normal']
+    scene.set_face(style)
+    scene.render()
+    scene.set_face(style, gaze=(2.5, -1.25))
+    _, rects = scene.render()
+    pupil = style['pupil_size'] + 4
+    assert 0 < sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) <= 4 * pupil * pupil
+
+
+def test_eyes_come_from_the_rasteriser():
+    style = robot_face.EMOTIONS['curious']
+    frame = fresh_render(style, 0.25, (0, 0))
+    expected = sdf.render_frames([style], [0.25], robot_face.EYE_POSITIONS, robot_face.EYE_COLOR,
+                                 robot_face.BG_COLOR, antialias=True)[0]
+    assert np.array_equal(frame, expected)
+
+
+def test_prerendered_blink_comes_from_the_cache():
+    scene = FaceScene(robot_face.EYE_POSITIONS, robot_face.EYE_COLOR, robot_face.BG_COLOR, pages=1,
+                      cache=FrameCache(blink_steps=8))
+    style, gaze = robot_face.EMOTIONS['happy'], (3, -2)
+    scene.prerender_blink(style, gaze)
+    drawn = scene.cache.misses
+    for step in range(9):
+        scene.set_face(style, step / 8, gaze)
+        frame = scene.render()[0]
+        # Every step is shown exactly as if it had been drawn there and then
+        assert np.array_equal(frame, fresh_render(style, step / 8, gaze))
+    assert scene.cache.misses == drawn and scene.cache.hits == 2 * 9
+
+
+def test_moving_a_node_damages_old_and_new_bounds():
+    scene = Scene(100, 50, (0, 0, 0))
+    dot = scene.add(RoundedRect((10, 10, 19, 19), 2, (255, 255, 255)))
+    scene.render()
+    dot.set(box=(60, 20, 69, 29))
+    _, rects = scene.render()
+    assert sorted(rects) == [(10, 10, 20, 20), (60, 20, 70, 30)]
+
+
+def test_pages_held_by_the_display_are_skipped():
+    held = set()
+    scene = Scene(100, 50, (0, 0, 0), in_use=lambda buffer: id(buffer) in held)
+    dot = scene.add(RoundedRect((10, 10, 19, 19), 2, (255, 255, 255)))
+    sending = None
+    for x in range(0, 60, 10):
+        dot.set(box=(x, 10, x + 9, 19))
+        frame, _ = scene.render()
+        if sending is not None:
+            # The frame still being sent was not drawn over, and is not drawn into next
+            assert sending[15, x - 5] != 0 and sending[15, x + 5] == 0
+            assert scene.canvas.buffer is not sending
+        assert scene.canvas.buffer is not frame
+        sending = frame
+        held.clear()
+        held.add(id(frame))
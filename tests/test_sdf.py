@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from face import robot_face, sdf
+
+BLINKS = [i / 8 for i in range(9)]
+
+
+def render(styles, blinks, antialias):
+    return sdf.render_frames(styles, blinks, robot_face.EYE_POSITIONS, robot_face.EYE_COLOR,
+                             robot_face.BG_COLOR, antialias=antialias)
+
+
+@pytest.mark.parametrize('antialias', (False, True))
+@pytest.mark.parametrize('emotion', robot_face.EMOTIONS)
+def test_reused_eye_matches_rasterised_eye(emotion, antialias, monkeypatch):
+    styles = [robot_face.EMOTIONS[emotion]] * len(BLINKS)
+    reused = render(styles, BLINKS, antialias)
+    monkeypatch.setattr(sdf, '_mirrored', lambda *args: False)
+    monkeypatch.setattr(sdf, '_shifted', lambda *args: False)
+    assert np.array_equal(reused, render(styles, BLINKS, antialias))
+
+
+def test_batch_matches_single_frames():
+    styles = [robot_face.EMOTIONS[emotion] for emotion in robot_face.EMOTIONS]
+    blinks = BLINKS[:len(styles)]
+    batch = render(styles, blinks, True)
+    for frame, style, blink in zip(batch, styles, blinks):
+        assert np.array_equal(frame, render([style], [blink], True)[0])
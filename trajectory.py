@@ -0,0 +1,94 @@
+"""
+Velocity- and acceleration-limited joint trajectories.
+
+A Trajectory moves several joints from start to end angles in the same
+time: the slowest joint under its own speed and acceleration limits sets
+the duration and every other joint is stretched to it. Two profiles:
+
+    'min_jerk'   s(t) = 10t^3 - 15t^4 + 6t^5, smooth start and stop
+    'trapezoid'  constant acceleration, cruise, constant deceleration
+
+Positions are floats, so sub-degree targets are kept, and sample() returns
+every control tick of the move in one array.
+"""
+import math
+
+import numpy as np
+
+PROFILES = ('min_jerk', 'trapezoid')
+
+# Peak speed and acceleration of a unit min-jerk move of unit duration
+MIN_JERK_SPEED = 1.875
+MIN_JERK_ACCEL = 10 / math.sqrt(3)
+
+
+def min_time(distance, speed, accel, profile='min_jerk'):
+    """Shortest time to move `distance` degrees within speed (deg/s) and accel (deg/s^2)"""
+    if distance == 0:
+        return 0.0
+    if profile == 'min_jerk':
+        return max(MIN_JERK_SPEED * distance / speed, math.sqrt(MIN_JERK_ACCEL * distance / accel))
+    if distance <= speed * speed / accel:
+        # Never reaches full speed: accelerate half way, decelerate the rest
+        return 2 * math.sqrt(distance / accel)
+    return distance / speed + speed / accel
+
+
+class Trajectory:
+    """
+    Synchronised move of len(start) joints. speed and accel are per-joint
+    limits (scalars or sequences, math.inf for none); duration, if given, is
+    a lower bound on the move time.
+    """
+    def __init__(self, start, end, speed, accel=math.inf, profile='min_jerk', duration=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}, expected one of {PROFILES}")
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.profile = profile
+        n = len(self.start)
+        self.speed = np.broadcast_to(np.asarray(speed, dtype=np.float64), (n,))
+        self.accel = np.broadcast_to(np.asarray(accel, dtype=np.float64), (n,))
+        distance = np.abs(self.end - self.start)
+        times = [min_time(d, v, a, profile) for d, v, a in zip(distance, self.speed, self.accel)]
+        self.duration = max(times + [duration or 0.0])
+
+        # Trapezoid: each joint cruises at the speed that fills the shared duration
+        if profile == 'trapezoid' and self.duration > 0:
+            T, a = self.duration, self.accel
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cruise = np.where(np.isinf(a), distance / T,
+                                  (a * T - np.sqrt(np.maximum(a * a * T * T - 4 * a * distance, 0))) / 2)
+            self._cruise = cruise
+            self._ramp = np.where(np.isinf(a), 0.0, cruise / np.where(np.isinf(a), 1, a))
+
+    def progress(self, t):
+        """Fraction of the way to end of each joint at times t, shape (len(t), joints)"""
+        t = np.asarray(t, dtype=np.float64)[:, None]
+        if self.duration <= 0:
+            return np.ones((len(t), len(self.start)))
+        if self.profile == 'min_jerk':
+            tau = np.clip(t / self.duration, 0, 1)
+            return np.broadcast_to(tau * tau * tau * (10 + tau * (-15 + 6 * tau)), (len(t), len(self.start)))
+
+        T = self.duration
+        t = np.clip(t, 0, T)
+        v, ramp = self._cruise, self._ramp
+        a = np.where(ramp > 0, v / np.where(ramp > 0, ramp, 1), 0)
+        distance = v * (T - ramp)
+        moved = np.where(t < ramp, 0.5 * a * t * t,
+                         np.where(t <= T - ramp, 0.5 * a * ramp * ramp + v * (t - ramp),
+                                  distance - 0.5 * a * (T - t) ** 2))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(distance > 0, moved / np.where(distance > 0, distance, 1), 1.0)
+
+    def at(self, t):
+        """Joint angles at times t (seconds from the start), one row per time"""
+        return self.start + (self.end - self.start) * self.progress(t)
+
+    def sample(self, rate):
+        """Joint angles at every tick of a `rate` Hz control loop, ending exactly on end"""
+        ticks = max(1, math.ceil(self.duration * rate - 1e-9))
+        angles = self.at(np.arange(1, ticks + 1) / rate)
+        angles[-1] = self.end
+        return angles